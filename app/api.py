@@ -24,6 +24,14 @@ async def lifespan(app: FastAPI):
     """
     logger.info("Starting application...")
     
+    # Barrido periódico de entradas del índice con archivos borrados
+    try:
+        from .repositories import download_index_repo
+        download_index_repo.start_integrity_sweep()
+        logger.info("Index integrity sweep started")
+    except Exception as e:
+        logger.error(f"Failed to start index integrity sweep: {str(e)}")
+    
     # Iniciar scheduler de limpieza
     if cleanup_settings.CLEANUP_SCHEDULE_ENABLED:
         try:
@@ -45,6 +53,12 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error stopping cleanup scheduler: {str(e)}")
     
+    try:
+        from .repositories import download_index_repo
+        download_index_repo.stop_integrity_sweep()
+    except Exception as e:
+        logger.error(f"Error stopping index integrity sweep: {str(e)}")
+    
     # Terminar jobs activos
     try:
         from .managers import job_manager
@@ -8,7 +8,7 @@ DEFAULT_QUALITY = "default"
 DEFAULT_VIDEO_FORMAT = "webm"
 
 # Patrones regex
-SPOTIFY_URI_PATTERN = r"^spotify:(track|album|playlist):([A-Za-z0-9]{22})$"
+SPOTIFY_URI_PATTERN = r"spotify:(track|album|playlist):([A-Za-z0-9]{22})"
 SPOTIFY_URL_PATTERN = r"^https?://open\.spotify\.com/(?:[A-Za-z\-]+/)?(track|album|playlist)/([A-Za-z0-9]{22})(?:[/?#].*)?$"
 BITRATE_PATTERN = r"^(0|bestaudio|\d+[kK]?)$"
 
@@ -19,9 +19,11 @@ YOUTUBE_URL_PREFIXES = (
     "https://youtube.com/",
     "https://youtu.be/",
     "https://music.youtube.com/",
+    "https://m.youtube.com/",
     "http://www.youtube.com/",
     "http://youtube.com/",
     "http://youtu.be/",
+    "http://m.youtube.com/",
 )
 
 # Mensajes de error
@@ -62,4 +64,4 @@ VIDEO_FORMAT_INFO = {
 }
 
 # Formatos de video permitidos
-ALLOWED_VIDEO_FORMATS = ["mp4", "webm", "mkv"]
+ALLOWED_VIDEO_FORMATS = frozenset({"mp4", "webm", "mkv"})
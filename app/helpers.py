@@ -2,15 +2,29 @@
 Utilidades y helpers de la aplicación.
 Funciones auxiliares para manejo de archivos, strings, fechas, etc.
 """
+import os
 import re
+import time
 import unicodedata
-from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import List, Set
 
 from .core.config import settings
 
 
+# Sanitización de nombres de archivo: barras -> '-', caracteres de control eliminados
+_SANITIZE_TRANS = str.maketrans(
+    {**{c: None for c in range(0x20)}, 0x7f: None, ord("/"): "-", ord("\\"): "-"}
+)
+_WS_RE = re.compile(r"\s+")
+
+# Formato ISO 8601 en UTC sin microsegundos
+_ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# Último timestamp ISO calculado, indexado por segundo epoch
+_now_iso_cache = (0, "")
+
+
 class DateTimeHelper:
     """Helper para manejo de fechas."""
     
@@ -22,7 +36,26 @@ class DateTimeHelper:
         Returns:
             String en formato ISO (ej: "2024-01-01T12:00:00Z")
         """
-        return datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+        return time.strftime(_ISO_FORMAT, time.gmtime())
+    
+    @staticmethod
+    def now_iso_cached() -> str:
+        """
+        Igual que now_iso, pero reutiliza el string dentro del mismo segundo.
+        
+        Como now_iso descarta los microsegundos, el resultado es idéntico;
+        solo se evita formatear la fecha en cada llamada.
+        
+        Returns:
+            String en formato ISO (ej: "2024-01-01T12:00:00Z")
+        """
+        global _now_iso_cache
+        second = int(time.time())
+        cached_second, cached_value = _now_iso_cache
+        if cached_second != second:
+            cached_value = time.strftime(_ISO_FORMAT, time.gmtime(second))
+            _now_iso_cache = (second, cached_value)
+        return cached_value
 
 
 class FileNameHelper:
@@ -50,10 +83,15 @@ class FileNameHelper:
         if max_length is None:
             max_length = settings.MAX_FILENAME_LENGTH
         
-        name = unicodedata.normalize("NFC", name)
-        name = name.replace("/", "-").replace("\\", "-")
-        name = re.sub(r"[\x00-\x1f\x7f]+", "", name)
-        name = re.sub(r"\s+", " ", name).strip()
+        # Acota el trabajo ante entradas enormes; el recorte final fija el límite real
+        if len(name) > max_length * 4:
+            name = name[:max_length * 4]
+        
+        # isascii es O(1) en CPython y todo texto ASCII ya está en NFC
+        if not name.isascii() and not unicodedata.is_normalized("NFC", name):
+            name = unicodedata.normalize("NFC", name)
+        name = name.translate(_SANITIZE_TRANS)
+        name = _WS_RE.sub(" ", name).strip()
         
         if len(name) > max_length:
             name = name[:max_length]
@@ -84,29 +122,31 @@ class FileNameHelper:
         
         raw = unicodedata.normalize("NFKD", name)
         out_chars = []
+        # Referencias locales para el bucle por carácter
+        append = out_chars.append
+        category = unicodedata.category
         
         for ch in raw:
             o = ord(ch)
             if o < 128:
                 # Evitar caracteres de control
                 if 32 <= o < 127:
-                    out_chars.append(ch)
+                    append(ch)
                 continue
             
             # Reemplazos específicos
             if ch in {"：", "﹕"}:  # fullwidth colon variants
-                out_chars.append(":")
+                append(":")
                 continue
             
             # Descarta diacríticos y otros -> '-'
-            cat = unicodedata.category(ch)
-            if cat.startswith("M"):
+            if category(ch).startswith("M"):
                 # marca diacrítica ignorada
                 continue
-            out_chars.append("-")
+            append("-")
         
         ascii_name = ''.join(out_chars)
-        ascii_name = re.sub(r"[\s]+", " ", ascii_name).strip()
+        ascii_name = _WS_RE.sub(" ", ascii_name).strip()
         
         if len(ascii_name) > max_length:
             ascii_name = ascii_name[:max_length]
@@ -135,6 +175,40 @@ class FileNameHelper:
         return candidate
 
 
+def _scan_by_extension(folder: Path, extensions: Set[str]) -> List[Path]:
+    """
+    Recorre una carpeta con os.scandir y devuelve los archivos con extensión dada.
+    
+    El tipo de cada entrada sale del propio directorio (sin stat extra) y la
+    extensión se filtra sobre el nombre, así solo se crea un Path por archivo
+    que coincide. Los enlaces a directorios no se siguen, como en rglob.
+    Si la carpeta no existe o no es un directorio devuelve una lista vacía,
+    así que no hace falta un exists() previo.
+    """
+    files = []
+    stack = [os.fspath(folder)]
+    append = files.append
+    push = stack.append
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        push(entry.path)
+                        continue
+                    name = entry.name
+                    dot = name.rfind(".")
+                    if dot <= 0:
+                        continue
+                    # Casi siempre la extensión ya viene en minúsculas
+                    suffix = name[dot:]
+                    if (suffix in extensions or suffix.lower() in extensions) and entry.is_file():
+                        append(Path(entry.path))
+        except OSError:
+            continue
+    return files
+
+
 class FileSystemHelper:
     """Helper para operaciones del sistema de archivos."""
     
@@ -149,14 +223,7 @@ class FileSystemHelper:
         Returns:
             Lista de rutas de archivos de audio
         """
-        if not folder.exists():
-            return []
-        
-        files = []
-        for p in folder.rglob("*"):
-            if p.is_file() and p.suffix.lower() in settings.AUDIO_EXTENSIONS:
-                files.append(p)
-        return files
+        return _scan_by_extension(folder, settings.AUDIO_EXTENSIONS)
     
     @staticmethod
     def list_video_files(folder: Path) -> List[Path]:
@@ -169,14 +236,7 @@ class FileSystemHelper:
         Returns:
             Lista de rutas de archivos de video
         """
-        if not folder.exists():
-            return []
-        
-        files = []
-        for p in folder.rglob("*"):
-            if p.is_file() and p.suffix.lower() in settings.VIDEO_EXTENSIONS:
-                files.append(p)
-        return files
+        return _scan_by_extension(folder, settings.VIDEO_EXTENSIONS)
     
     @staticmethod
     def list_media_files(folder: Path, media_type: str = "audio") -> List[Path]:
@@ -217,16 +217,6 @@ class MetadataManager:
             raise JobNotFoundException(job_id=job_id)
         return metadata
     
-    @staticmethod
-    def write_metadata(metadata: JobMetadata) -> None:
-        """
-        Escribe metadatos (alias de save_metadata para consistencia).
-        
-        Args:
-            metadata: Objeto JobMetadata a guardar
-        """
-        MetadataManager.save_metadata(metadata)
-    
     @staticmethod
     def save_metadata(metadata: JobMetadata) -> None:
         """
@@ -237,7 +227,10 @@ class MetadataManager:
         """
         path = MetadataManager.get_metadata_path(metadata.job_id)
         with open(path, "w", encoding="utf-8") as f:
-            json.dump(metadata.dict(), f, indent=2, ensure_ascii=False)
+            json.dump(metadata.model_dump(), f, indent=2, ensure_ascii=False)
+    
+    # Alias de save_metadata para consistencia con read_metadata
+    write_metadata = save_metadata
     
     @staticmethod
     def load_metadata(job_id: str) -> Optional[JobMetadata]:
@@ -2,16 +2,185 @@
 Repositorios de almacenamiento con patrón Repository.
 Abstrae la lógica de acceso a datos de SQLite.
 """
+import os
+import logging
 import sqlite3
 import json
 import hashlib
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Iterator, Callable
 from abc import ABC, abstractmethod
 
 from .core.config import settings
 from .schemas import DownloadIndexEntry, MediaInfo
 
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # dependencia opcional
+    orjson = None
+
+
+# files_json de una descarga pendiente, que todavía no tiene archivos
+_EMPTY_JSON = "[]"
+
+
+def _dumps_files(files: List[str]) -> str:
+    """Serializa la lista de archivos, con orjson si está instalado."""
+    if orjson is not None:
+        return orjson.dumps(files).decode()
+    return json.dumps(files)
+
+
+# Sentencias del camino caliente del índice. Mantenerlas como constantes
+# asegura que la caché de sentencias preparadas de sqlite3 las reutilice
+_SQL_LOOKUP = """SELECT url, type, quality, format, files_json, status, job_id, 
+                        created_at, last_access, error, first_file 
+                 FROM downloads 
+                 WHERE url=? AND type=? AND quality=? AND format=?"""
+
+_SQL_LOOKUP_STATUS = """SELECT status, job_id 
+                        FROM downloads 
+                        WHERE url=? AND type=? AND quality=? AND format=?"""
+
+_SQL_FIND_BY_JOB = """SELECT url, type, quality, format, files_json, status, job_id, 
+                             created_at, last_access, error 
+                      FROM downloads 
+                      WHERE job_id=?"""
+
+_SQL_TOUCH = """UPDATE downloads SET last_access=? 
+                WHERE url=? AND type=? AND quality=? AND format=?"""
+
+_SQL_TOUCH_READY_RETURNING = """UPDATE downloads SET last_access=? 
+                                WHERE url=? AND type=? AND quality=? AND format=? 
+                                  AND status='ready' 
+                                RETURNING url, type, quality, format, files_json, status, job_id, 
+                                          created_at, last_access, error, first_file"""
+
+# Registra un pendiente salvo que ya haya otro en curso para la misma clave
+_SQL_REGISTER_PENDING = """INSERT INTO downloads(url, type, quality, format, files_json, status, 
+                                                 job_id, created_at, last_access, error)
+                           VALUES (?,?,?,?,?, 'pending', ?, ?, NULL, NULL)
+                           ON CONFLICT(url, type, quality, format) DO UPDATE SET
+                               job_id=excluded.job_id,
+                               status='pending',
+                               files_json=excluded.files_json,
+                               first_file=NULL,
+                               error=NULL,
+                               created_at=excluded.created_at,
+                               last_access=NULL
+                           WHERE downloads.status != 'pending'"""
+
+# Igual que _SQL_REGISTER_PENDING, para cuando la transacción ya descartó un pendiente vivo
+_SQL_FORCE_PENDING = """INSERT INTO downloads(url, type, quality, format, files_json, status, 
+                                              job_id, created_at, last_access, error)
+                        VALUES (?,?,?,?,?, 'pending', ?, ?, NULL, NULL)
+                        ON CONFLICT(url, type, quality, format) DO UPDATE SET
+                            job_id=excluded.job_id,
+                            status='pending',
+                            files_json=excluded.files_json,
+                            first_file=NULL,
+                            error=NULL,
+                            created_at=excluded.created_at,
+                            last_access=NULL"""
+
+_SQL_UPSERT_READY = """INSERT INTO downloads(url, type, quality, format, files_json, first_file, 
+                                             status, job_id, created_at, last_access, error)
+                       VALUES (?,?,?,?,?,?, 'ready', ?, ?, ?, NULL)
+                       ON CONFLICT(url, type, quality, format) DO UPDATE SET
+                           files_json=excluded.files_json,
+                           first_file=excluded.first_file,
+                           status='ready',
+                           job_id=COALESCE(excluded.job_id, downloads.job_id),
+                           created_at=COALESCE(downloads.created_at, excluded.created_at),
+                           last_access=excluded.last_access,
+                           error=NULL"""
+
+_SQL_REGISTER_SUCCESS = """UPDATE downloads SET files_json=?, first_file=?, status='ready', error=NULL 
+                           WHERE job_id=?"""
+
+_SQL_REGISTER_FAILED = "UPDATE downloads SET status='failed', error=? WHERE job_id=?"
+
+# UPDATE ... RETURNING está disponible desde SQLite 3.35
+_SUPPORTS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Intervalo del barrido de integridad de entradas 'ready' y tamaño de lote
+_INTEGRITY_SWEEP_INTERVAL_SECONDS = 300.0
+_INTEGRITY_SWEEP_BATCH = 500
+
+# Caché de existencia de archivos para lookups repetidos sobre la misma descarga
+_EXISTS_TTL_SECONDS = 5.0
+_EXISTS_CACHE_CAPACITY = 4096
+_EXISTS_CACHE: Dict[str, Tuple[float, bool]] = {}
+
+
+def _file_exists(path: str) -> bool:
+    """
+    Indica si un archivo existe, reutilizando resultados de los últimos segundos.
+    
+    Args:
+        path: Ruta del archivo
+        
+    Returns:
+        True si el archivo existe
+    """
+    now = time.monotonic()
+    cached = _EXISTS_CACHE.get(path)
+    if cached is not None and now - cached[0] < _EXISTS_TTL_SECONDS:
+        return cached[1]
+    
+    try:
+        os.stat(path)
+        exists = True
+    except FileNotFoundError:
+        exists = False
+    
+    if cached is None and len(_EXISTS_CACHE) >= _EXISTS_CACHE_CAPACITY:
+        # Desalojo FIFO: el dict conserva el orden de inserción
+        try:
+            del _EXISTS_CACHE[next(iter(_EXISTS_CACHE))]
+        except (StopIteration, KeyError, RuntimeError):
+            pass
+    _EXISTS_CACHE[path] = (now, exists)
+    return exists
+
+
+def _first_file(files: List[str]) -> Optional[str]:
+    """Devuelve el único archivo de la lista, o None si hay cero o varios."""
+    return files[0] if len(files) == 1 else None
+
+
+def _decode_files(files_json: Optional[str], first_file: Optional[str]) -> List[str]:
+    """
+    Reconstruye la lista de archivos de una fila.
+    
+    Las filas de un solo archivo lo guardan también en first_file, lo que
+    evita parsear el JSON en el caso habitual.
+    """
+    if first_file is not None:
+        return [first_file]
+    return json.loads(files_json) if files_json else []
+
+
+def _entry_from_row(row: tuple) -> DownloadIndexEntry:
+    """Construye un DownloadIndexEntry a partir de una fila de _SQL_LOOKUP."""
+    return DownloadIndexEntry(
+        url=row[0],
+        type=row[1],
+        quality=row[2] or None,
+        format=row[3] or None,
+        files=_decode_files(row[4], row[10]),
+        status=row[5],
+        job_id=row[6],
+        created_at=row[7],
+        last_access=row[8],
+        error=row[9],
+    )
+
 
 class BaseRepository(ABC):
     """Clase base abstracta para repositorios."""
@@ -25,16 +194,44 @@ class BaseRepository(ABC):
         """
         self.db_path = db_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._con = self._connect()
         self.ensure_schema()
     
     def _connect(self) -> sqlite3.Connection:
         """
-        Crea una conexión a la base de datos.
+        Crea la conexión de larga duración del repositorio.
+        
+        WAL permite lectores concurrentes con un único escritor; los PRAGMA
+        se aplican una sola vez por conexión.
         
         Returns:
             Conexión SQLite
         """
-        return sqlite3.connect(str(self.db_path), check_same_thread=False)
+        con = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.execute("PRAGMA temp_store=MEMORY")
+        con.execute("PRAGMA mmap_size=268435456")
+        return con
+    
+    @contextmanager
+    def _session(self) -> Iterator[sqlite3.Connection]:
+        """
+        Da acceso exclusivo a la conexión compartida.
+        
+        Si la operación falla, descarta la transacción abierta para no
+        dejarla pendiente en la conexión.
+        
+        Yields:
+            Conexión SQLite
+        """
+        with self._lock:
+            try:
+                yield self._con
+            except BaseException:
+                self._con.rollback()
+                raise
     
     @abstractmethod
     def ensure_schema(self) -> None:
@@ -48,18 +245,30 @@ class DownloadIndexRepository(BaseRepository):
     Gestiona el cache de descargas previas.
     """
     
+    def __init__(self, db_path: Path):
+        """
+        Inicializa el repositorio.
+        
+        Args:
+            db_path: Ruta a la base de datos SQLite
+        """
+        super().__init__(db_path)
+        self._sweep_lock = threading.Lock()
+        self._sweep_stop = threading.Event()
+        self._sweep_thread: Optional[threading.Thread] = None
+    
     def ensure_schema(self) -> None:
         """Crea la tabla downloads si no existe."""
-        con = self._connect()
-        try:
+        with self._session() as con:
             con.execute(
                 """
                 CREATE TABLE IF NOT EXISTS downloads (
                   url TEXT NOT NULL,
                   type TEXT NOT NULL,
-                  quality TEXT,
-                  format TEXT,
+                  quality TEXT NOT NULL DEFAULT '',
+                  format TEXT NOT NULL DEFAULT '',
                   files_json TEXT,
+                  first_file TEXT,
                   status TEXT NOT NULL,
                   job_id TEXT,
                   created_at TEXT NOT NULL,
@@ -69,9 +278,20 @@ class DownloadIndexRepository(BaseRepository):
                 )
                 """
             )
+            # Migración: bases antiguas guardaban NULL en lugar de ''. Con ''
+            # las búsquedas usan igualdad directa sobre la clave primaria
+            con.execute("UPDATE OR REPLACE downloads SET quality='' WHERE quality IS NULL")
+            con.execute("UPDATE OR REPLACE downloads SET format='' WHERE format IS NULL")
+            con.execute("CREATE INDEX IF NOT EXISTS idx_downloads_job ON downloads(job_id)")
+            # Migración: first_file duplica el archivo de las filas de un solo archivo
+            columns = {row[1] for row in con.execute("PRAGMA table_info(downloads)")}
+            if "first_file" not in columns:
+                con.execute("ALTER TABLE downloads ADD COLUMN first_file TEXT")
+                con.execute(
+                    """UPDATE downloads SET first_file=json_extract(files_json, '$[0]')
+                       WHERE json_valid(files_json) AND json_array_length(files_json)=1"""
+                )
             con.commit()
-        finally:
-            con.close()
     
     def lookup(
         self,
@@ -92,43 +312,100 @@ class DownloadIndexRepository(BaseRepository):
         Returns:
             DownloadIndexEntry si se encuentra, None si no
         """
-        con = self._connect()
-        try:
+        with self._session() as con:
             cur = con.execute(
-                """SELECT url, type, quality, format, files_json, status, job_id, 
-                          created_at, last_access, error 
-                   FROM downloads 
-                   WHERE url=? AND type=? 
-                     AND IFNULL(quality,'')=IFNULL(?, '') 
-                     AND IFNULL(format,'')=IFNULL(?, '')""",
-                (url, media_type, quality, format_),
+                _SQL_LOOKUP,
+                (url, media_type, quality or '', format_ or ''),
             )
             row = cur.fetchone()
             if not row:
                 return None
             
-            entry = DownloadIndexEntry(
-                url=row[0],
-                type=row[1],
-                quality=row[2],
-                format=row[3],
-                files=json.loads(row[4]) if row[4] else [],
-                status=row[5],
-                job_id=row[6],
-                created_at=row[7],
-                last_access=row[8],
-                error=row[9],
-            )
+            # Sin stat ni escritura: las entradas con archivos borrados las
+            # marca integrity_sweep o quien falle al servir el archivo
+            return _entry_from_row(row)
+    
+    def lookup_status(
+        self,
+        url: str,
+        media_type: str,
+        quality: Optional[str] = None,
+        format_: Optional[str] = None
+    ) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        Obtiene solo el estado y el job_id de una descarga.
+        
+        Evita leer los archivos y construir el DownloadIndexEntry cuando el
+        llamador solo necesita saber si hay un job pendiente.
+        
+        Args:
+            url: URL a buscar
+            media_type: Tipo de media
+            quality: Calidad opcional
+            format_: Formato opcional
             
-            if entry.status == "ready":
-                missing = [p for p in entry.files if not Path(p).exists()]
-                if missing:
-                    self._mark_as_failed(url, media_type, quality, format_, f"missing_files:{missing}")
-                    return None
+        Returns:
+            Tupla (status, job_id) si se encuentra, None si no
+        """
+        with self._session() as con:
+            row = con.execute(
+                _SQL_LOOKUP_STATUS,
+                (url, media_type, quality or '', format_ or ''),
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+    
+    def lookup_and_touch(
+        self,
+        url: str,
+        media_type: str,
+        quality: Optional[str],
+        format_: Optional[str],
+        now: str
+    ) -> Optional[DownloadIndexEntry]:
+        """
+        Busca una descarga lista y actualiza su último acceso.
+        
+        La entrada se lee y se toca con un único UPDATE ... RETURNING. Si
+        alguno de sus archivos ya no existe, se marca como fallida y se
+        devuelve None. Para conocer el estado de entradas no listas, usar
+        lookup_status.
+        
+        Args:
+            url: URL a buscar
+            media_type: Tipo de media
+            quality: Calidad opcional
+            format_: Formato opcional
+            now: Timestamp de acceso
             
-            return entry
-        finally:
-            con.close()
+        Returns:
+            DownloadIndexEntry si existe con status 'ready', None si no
+        """
+        if not _SUPPORTS_RETURNING:
+            entry = self.lookup(url, media_type, quality, format_)
+            if not entry or entry.status != "ready":
+                return None
+            self.touch(url, media_type, quality, format_, now)
+            entry.last_access = now
+        else:
+            with self._session() as con:
+                row = con.execute(
+                    _SQL_TOUCH_READY_RETURNING,
+                    (now, url, media_type, quality or '', format_ or ''),
+                ).fetchone()
+                con.commit()
+            
+            if not row:
+                return None
+            entry = _entry_from_row(row)
+        
+        # Comprobación barata (con caché de pocos segundos) antes de ofrecerla
+        missing = [p for p in entry.files if not _file_exists(p)]
+        if missing:
+            self.mark_as_failed_bulk(
+                [(url, media_type, quality, format_, f"missing_files:{missing}")]
+            )
+            return None
+        return entry
     
     def find_by_job_id(self, job_id: str) -> Optional[DownloadIndexEntry]:
         """
@@ -140,13 +417,9 @@ class DownloadIndexRepository(BaseRepository):
         Returns:
             DownloadIndexEntry si se encuentra, None si no
         """
-        con = self._connect()
-        try:
+        with self._session() as con:
             cur = con.execute(
-                """SELECT url, type, quality, format, files_json, status, job_id, 
-                          created_at, last_access, error 
-                   FROM downloads 
-                   WHERE job_id=?""",
+                _SQL_FIND_BY_JOB,
                 (job_id,),
             )
             row = cur.fetchone()
@@ -156,8 +429,8 @@ class DownloadIndexRepository(BaseRepository):
             return DownloadIndexEntry(
                 url=row[0],
                 type=row[1],
-                quality=row[2],
-                format=row[3],
+                quality=row[2] or None,
+                format=row[3] or None,
                 files=json.loads(row[4]) if row[4] else [],
                 status=row[5],
                 job_id=row[6],
@@ -165,70 +438,151 @@ class DownloadIndexRepository(BaseRepository):
                 last_access=row[8],
                 error=row[9],
             )
-        finally:
-            con.close()
     
-    def _mark_as_failed(
+    def register_pending(
         self,
         url: str,
         media_type: str,
         quality: Optional[str],
         format_: Optional[str],
-        error: str
+        job_id: str,
+        created_at: str
     ) -> None:
-        """Marca una entrada como fallida (uso interno)."""
-        con = self._connect()
-        try:
+        """
+        Registra una descarga pendiente.
+        
+        Args:
+            url: URL de la descarga
+            media_type: Tipo de media
+            quality: Calidad opcional
+            format_: Formato opcional
+            job_id: ID del job
+            created_at: Timestamp de creación
+        """
+        with self._session() as con:
             con.execute(
-                """UPDATE downloads SET status='failed', error=? 
-                   WHERE url=? AND type=? 
-                     AND IFNULL(quality,'')=IFNULL(?, '') 
-                     AND IFNULL(format,'')=IFNULL(?, '')""",
-                (error, url, media_type, quality, format_),
+                _SQL_REGISTER_PENDING,
+                (url, media_type, quality or '', format_ or '', _EMPTY_JSON, job_id, created_at),
             )
             con.commit()
-        finally:
-            con.close()
     
-    def register_pending(
+    def ensure_or_start(
         self,
         url: str,
         media_type: str,
         quality: Optional[str],
         format_: Optional[str],
-        job_id: str,
-        created_at: str
-    ) -> None:
+        job_id_factory: Callable[[], str],
+        now: str,
+        catalog_lookup: Optional[
+            Callable[[], Optional[Tuple[Optional[str], Optional[str], List[str]]]]
+        ] = None
+    ) -> Tuple[str, DownloadIndexEntry]:
         """
-        Registra una descarga pendiente.
+        Resuelve una petición de descarga: reutiliza, espera o registra un job.
+        
+        La comprobación de archivos en disco y la consulta al catálogo se hacen
+        antes de abrir la transacción. Dentro de BEGIN IMMEDIATE solo se relee
+        la clave y se escribe, así dos peticiones concurrentes (aunque vengan
+        de otro worker) no registran dos jobs pendientes para la misma clave,
+        y el bloqueo de escritura no espera a E/S ni al lock del catálogo.
         
         Args:
-            url: URL de la descarga
+            url: URL
             media_type: Tipo de media
             quality: Calidad opcional
             format_: Formato opcional
-            job_id: ID del job
-            created_at: Timestamp de creación
+            job_id_factory: Genera el job_id si hay que iniciar una descarga
+            now: Timestamp actual
+            catalog_lookup: Consulta al catálogo si no hay entrada utilizable;
+                devuelve (calidad, formato, archivos) o None
+            
+        Returns:
+            Tupla (estado, entrada) con estado 'ready', 'catalog', 'pending' o 'new'
         """
-        con = self._connect()
-        try:
+        key = (url, media_type, quality or '', format_ or '')
+        
+        # 1. Lectura fuera de la transacción
+        with self._session() as con:
+            seen = con.execute(
+                _SQL_LOOKUP,
+                key,
+            ).fetchone()
+        
+        if seen:
+            if seen[5] == "ready" and all(
+                _file_exists(p) for p in _decode_files(seen[4], seen[10])
+            ):
+                self.touch(url, media_type, quality, format_, now)
+                entry = _entry_from_row(seen)
+                entry.last_access = now
+                return "ready", entry
+            if seen[5] == "pending" and seen[6]:
+                return "pending", _entry_from_row(seen)
+        
+        # 2. Sin entrada utilizable: el catálogo puede resolverla sin descargar
+        found = catalog_lookup() if catalog_lookup else None
+        
+        # 3. Transacción corta: releer la clave y escribir
+        with self._session() as con:
+            con.execute("BEGIN IMMEDIATE")
+            row = con.execute(
+                _SQL_LOOKUP,
+                key,
+            ).fetchone()
+            
+            if row and row[5] == "pending" and row[6]:
+                con.commit()
+                return "pending", _entry_from_row(row)
+            
+            # Otra petición la completó entre la lectura y la transacción
+            if row and row[5] == "ready" and (
+                seen is None or (row[4], row[5], row[10]) != (seen[4], seen[5], seen[10])
+            ):
+                con.execute(
+                    _SQL_TOUCH,
+                    (now, *key),
+                )
+                con.commit()
+                entry = _entry_from_row(row)
+                entry.last_access = now
+                return "ready", entry
+            
+            if found:
+                found_quality, found_format, files = found
+                con.execute(
+                    _SQL_UPSERT_READY,
+                    (url, media_type, found_quality or '', found_format or '',
+                     _dumps_files(files), _first_file(files), None, now, now),
+                )
+                con.commit()
+                return "catalog", DownloadIndexEntry(
+                    url=url,
+                    type=media_type,
+                    quality=found_quality,
+                    format=found_format,
+                    files=files,
+                    status="ready",
+                    created_at=now,
+                    last_access=now,
+                )
+            
+            # La transacción ya descartó un pendiente vivo: se puede sobrescribir
+            job_id = job_id_factory()
             con.execute(
-                """INSERT INTO downloads(url, type, quality, format, files_json, status, 
-                                        job_id, created_at, last_access, error)
-                   VALUES (?,?,?,?,?, 'pending', ?, ?, NULL, NULL)
-                   ON CONFLICT(url, type, quality, format) DO UPDATE SET
-                       job_id=excluded.job_id,
-                       status='pending',
-                       files_json=excluded.files_json,
-                       error=NULL,
-                       created_at=excluded.created_at,
-                       last_access=NULL
-                   WHERE downloads.status != 'pending'""",
-                (url, media_type, quality, format_, json.dumps([]), job_id, created_at),
+                _SQL_FORCE_PENDING,
+                (*key, _EMPTY_JSON, job_id, now),
             )
             con.commit()
-        finally:
-            con.close()
+            return "new", DownloadIndexEntry(
+                url=url,
+                type=media_type,
+                quality=quality,
+                format=format_,
+                status="pending",
+                job_id=job_id,
+                created_at=now,
+            )
     
     def register_success(self, job_id: str, files: List[str]) -> None:
         """
@@ -238,16 +592,12 @@ class DownloadIndexRepository(BaseRepository):
             job_id: ID del job
             files: Lista de archivos resultantes
         """
-        con = self._connect()
-        try:
+        with self._session() as con:
             con.execute(
-                """UPDATE downloads SET files_json=?, status='ready', error=NULL 
-                   WHERE job_id=?""",
-                (json.dumps(files), job_id),
+                _SQL_REGISTER_SUCCESS,
+                (_dumps_files(files), _first_file(files), job_id),
             )
             con.commit()
-        finally:
-            con.close()
     
     def register_failed(self, job_id: str, error: str) -> None:
         """
@@ -257,15 +607,13 @@ class DownloadIndexRepository(BaseRepository):
             job_id: ID del job
             error: Mensaje de error
         """
-        con = self._connect()
-        try:
+        with self._session() as con:
             con.execute(
-                "UPDATE downloads SET status='failed', error=? WHERE job_id=?",
+                _SQL_REGISTER_FAILED,
                 (error, job_id),
             )
             con.commit()
-        finally:
-            con.close()
+        _EXISTS_CACHE.clear()
     
     def touch(
         self,
@@ -285,18 +633,12 @@ class DownloadIndexRepository(BaseRepository):
             format_: Formato opcional
             last_access: Timestamp de acceso
         """
-        con = self._connect()
-        try:
+        with self._session() as con:
             con.execute(
-                """UPDATE downloads SET last_access=? 
-                   WHERE url=? AND type=? 
-                     AND IFNULL(quality,'')=IFNULL(?, '') 
-                     AND IFNULL(format,'')=IFNULL(?, '')""",
-                (last_access, url, media_type, quality, format_),
+                _SQL_TOUCH,
+                (last_access, url, media_type, quality or '', format_ or ''),
             )
             con.commit()
-        finally:
-            con.close()
     
     def upsert_ready(
         self,
@@ -320,61 +662,13 @@ class DownloadIndexRepository(BaseRepository):
             created_at: Timestamp
             job_id: ID del job opcional
         """
-        con = self._connect()
-        try:
+        with self._session() as con:
             con.execute(
-                """INSERT INTO downloads(url, type, quality, format, files_json, status, 
-                                        job_id, created_at, last_access, error)
-                   VALUES (?,?,?,?,?, 'ready', ?, ?, ?, NULL)
-                   ON CONFLICT(url, type, quality, format) DO UPDATE SET
-                      files_json=excluded.files_json,
-                      status='ready',
-                      job_id=COALESCE(excluded.job_id, downloads.job_id),
-                      created_at=COALESCE(downloads.created_at, excluded.created_at),
-                      last_access=excluded.last_access,
-                      error=NULL""",
-                (url, media_type, quality, format_, json.dumps(files), job_id, created_at, created_at),
+                _SQL_UPSERT_READY,
+                (url, media_type, quality or '', format_ or '', _dumps_files(files), _first_file(files),
+                 job_id, created_at, created_at),
             )
             con.commit()
-        finally:
-            con.close()
-    
-    def find_by_job_id(self, job_id: str) -> Optional[DownloadIndexEntry]:
-        """
-        Busca una entrada por job_id.
-        
-        Args:
-            job_id: ID del job
-            
-        Returns:
-            DownloadIndexEntry si se encuentra
-        """
-        con = self._connect()
-        try:
-            cur = con.execute(
-                """SELECT url, type, quality, format, files_json, status, job_id,
-                          created_at, last_access, error
-                   FROM downloads WHERE job_id=?""",
-                (job_id,)
-            )
-            row = cur.fetchone()
-            if not row:
-                return None
-            
-            return DownloadIndexEntry(
-                url=row[0],
-                type=row[1],
-                quality=row[2],
-                format=row[3],
-                files=json.loads(row[4]) if row[4] else [],
-                status=row[5],
-                job_id=row[6],
-                created_at=row[7],
-                last_access=row[8],
-                error=row[9],
-            )
-        finally:
-            con.close()
     
     def get_all_ready_entries(self) -> List[DownloadIndexEntry]:
         """
@@ -383,8 +677,7 @@ class DownloadIndexRepository(BaseRepository):
         Returns:
             Lista de DownloadIndexEntry
         """
-        con = self._connect()
-        try:
+        with self._session() as con:
             cur = con.execute(
                 """SELECT url, type, quality, format, files_json, status, job_id,
                           created_at, last_access, error
@@ -397,8 +690,8 @@ class DownloadIndexRepository(BaseRepository):
                 entries.append(DownloadIndexEntry(
                     url=row[0],
                     type=row[1],
-                    quality=row[2],
-                    format=row[3],
+                    quality=row[2] or None,
+                    format=row[3] or None,
                     files=json.loads(row[4]) if row[4] else [],
                     status=row[5],
                     job_id=row[6],
@@ -408,8 +701,6 @@ class DownloadIndexRepository(BaseRepository):
                 ))
             
             return entries
-        finally:
-            con.close()
     
     def get_old_failed_entries(self, max_age_hours: float) -> List[DownloadIndexEntry]:
         """
@@ -423,8 +714,7 @@ class DownloadIndexRepository(BaseRepository):
         """
         from datetime import datetime, timedelta
         
-        con = self._connect()
-        try:
+        with self._session() as con:
             # Calcular timestamp límite
             cutoff = (datetime.now() - timedelta(hours=max_age_hours)).isoformat()
             
@@ -442,8 +732,8 @@ class DownloadIndexRepository(BaseRepository):
                 entries.append(DownloadIndexEntry(
                     url=row[0],
                     type=row[1],
-                    quality=row[2],
-                    format=row[3],
+                    quality=row[2] or None,
+                    format=row[3] or None,
                     files=json.loads(row[4]) if row[4] else [],
                     status=row[5],
                     job_id=row[6],
@@ -453,8 +743,6 @@ class DownloadIndexRepository(BaseRepository):
                 ))
             
             return entries
-        finally:
-            con.close()
     
     def delete_entry(
         self,
@@ -475,19 +763,165 @@ class DownloadIndexRepository(BaseRepository):
         Returns:
             True si se eliminó, False si no existía
         """
-        con = self._connect()
-        try:
+        with self._session() as con:
             cur = con.execute(
                 """DELETE FROM downloads 
                    WHERE url=? AND type=? 
-                     AND IFNULL(quality,'')=IFNULL(?, '') 
-                     AND IFNULL(format,'')=IFNULL(?, '')""",
-                (url, media_type, quality, format_),
+                     AND quality=? 
+                     AND format=?""",
+                (url, media_type, quality or '', format_ or ''),
             )
             con.commit()
             return cur.rowcount > 0
-        finally:
-            con.close()
+    
+    def delete_entries_bulk(
+        self,
+        keys: List[Tuple[str, str, Optional[str], Optional[str]]]
+    ) -> int:
+        """
+        Elimina varias entradas del índice en una sola transacción.
+        
+        Args:
+            keys: Tuplas (url, tipo, calidad, formato)
+            
+        Returns:
+            Número de entradas eliminadas
+        """
+        if not keys:
+            return 0
+        with self._session() as con:
+            cur = con.executemany(
+                """DELETE FROM downloads 
+                   WHERE url=? AND type=? 
+                     AND quality=? 
+                     AND format=?""",
+                [(url, media_type, quality or '', format_ or '')
+                 for url, media_type, quality, format_ in keys],
+            )
+            con.commit()
+            return cur.rowcount
+    
+    def mark_as_failed_bulk(
+        self,
+        items: List[Tuple[str, str, Optional[str], Optional[str], str]]
+    ) -> int:
+        """
+        Marca varias entradas como fallidas en una sola transacción.
+        
+        Args:
+            items: Tuplas (url, tipo, calidad, formato, error)
+            
+        Returns:
+            Número de entradas actualizadas
+        """
+        if not items:
+            return 0
+        with self._session() as con:
+            cur = con.executemany(
+                """UPDATE downloads SET status='failed', error=? 
+                   WHERE url=? AND type=? 
+                     AND quality=? 
+                     AND format=?""",
+                [(error, url, media_type, quality or '', format_ or '')
+                 for url, media_type, quality, format_, error in items],
+            )
+            con.commit()
+        _EXISTS_CACHE.clear()
+        return cur.rowcount
+    
+    def mark_missing_file(self, path: str) -> int:
+        """
+        Marca como fallidas las entradas 'ready' que incluyen un archivo.
+        
+        Cubre también las entradas que vienen del catálogo, que no tienen job_id.
+        
+        Args:
+            path: Ruta del archivo que ya no existe
+            
+        Returns:
+            Número de entradas actualizadas
+        """
+        with self._session() as con:
+            cur = con.execute(
+                """UPDATE downloads SET status='failed', error=? 
+                   WHERE status='ready' 
+                     AND (first_file=? 
+                          OR (first_file IS NULL AND json_valid(files_json) 
+                              AND EXISTS (SELECT 1 FROM json_each(downloads.files_json) 
+                                          WHERE json_each.value=?)))""",
+                (f"missing_files:{[path]}", path, path),
+            )
+            con.commit()
+        _EXISTS_CACHE.clear()
+        return cur.rowcount
+    
+    def integrity_sweep(self, batch_size: int = _INTEGRITY_SWEEP_BATCH) -> int:
+        """
+        Marca como fallidas las entradas 'ready' cuyos archivos ya no existen.
+        
+        Recorre la tabla por lotes de rowid para no retener el lock mientras
+        se consultan los archivos en disco.
+        
+        Args:
+            batch_size: Filas leídas por lote
+            
+        Returns:
+            Número de entradas marcadas como fallidas
+        """
+        marked = 0
+        last_rowid = 0
+        while True:
+            with self._session() as con:
+                rows = con.execute(
+                    """SELECT rowid, url, type, quality, format, files_json, first_file 
+                       FROM downloads 
+                       WHERE status='ready' AND rowid>? 
+                       ORDER BY rowid LIMIT ?""",
+                    (last_rowid, batch_size),
+                ).fetchall()
+            if not rows:
+                return marked
+            last_rowid = rows[-1][0]
+            
+            orphans = []
+            for _, url, media_type, quality, format_, files_json, first_file in rows:
+                missing = [
+                    p for p in _decode_files(files_json, first_file)
+                    if not os.path.exists(p)
+                ]
+                if missing:
+                    orphans.append((url, media_type, quality, format_, f"missing_files:{missing}"))
+            marked += self.mark_as_failed_bulk(orphans)
+    
+    def start_integrity_sweep(self) -> None:
+        """
+        Inicia el hilo que ejecuta integrity_sweep periódicamente.
+        
+        Se llama desde el arranque de la aplicación, no al importar el módulo,
+        para que scripts y otros procesos que usan el repositorio no lo lancen.
+        """
+        with self._sweep_lock:
+            if self._sweep_thread is not None and self._sweep_thread.is_alive():
+                return
+            self._sweep_stop.clear()
+            self._sweep_thread = threading.Thread(
+                target=self._sweep_forever, name="index-integrity-sweep", daemon=True
+            )
+            self._sweep_thread.start()
+    
+    def stop_integrity_sweep(self) -> None:
+        """Detiene el hilo de integrity_sweep, si está en marcha."""
+        self._sweep_stop.set()
+    
+    def _sweep_forever(self) -> None:
+        """Ejecuta integrity_sweep periódicamente hasta stop_integrity_sweep."""
+        while not self._sweep_stop.wait(_INTEGRITY_SWEEP_INTERVAL_SECONDS):
+            try:
+                marked = self.integrity_sweep()
+                if marked:
+                    logger.info(f"Integrity sweep marked {marked} entries as failed")
+            except Exception as e:
+                logger.error(f"Integrity sweep failed: {str(e)}")
     
     def _get_total_records(self) -> int:
         """
@@ -496,13 +930,10 @@ class DownloadIndexRepository(BaseRepository):
         Returns:
             Número de registros
         """
-        con = self._connect()
-        try:
+        with self._session() as con:
             cur = con.execute("SELECT COUNT(*) FROM downloads")
             row = cur.fetchone()
             return row[0] if row else 0
-        finally:
-            con.close()
 
 
 
@@ -514,8 +945,7 @@ class MediaRepository(BaseRepository):
     
     def ensure_schema(self) -> None:
         """Crea las tablas de media si no existen."""
-        con = self._connect()
-        try:
+        with self._session() as con:
             con.execute(
                 """CREATE TABLE IF NOT EXISTS media_files (
                   hash TEXT PRIMARY KEY,
@@ -536,8 +966,6 @@ class MediaRepository(BaseRepository):
                 )"""
             )
             con.commit()
-        finally:
-            con.close()
     
     @staticmethod
     def compute_hash(file_path: Path) -> str:
@@ -580,8 +1008,7 @@ class MediaRepository(BaseRepository):
         file_hash = self.compute_hash(file_path)
         size = file_path.stat().st_size
         
-        con = self._connect()
-        try:
+        with self._session() as con:
             con.execute(
                 """INSERT OR REPLACE INTO media_files
                    (hash, path, size_bytes, created_at, quality, format, display_name) 
@@ -589,8 +1016,6 @@ class MediaRepository(BaseRepository):
                 (file_hash, str(file_path), size, created_at, quality, format_, display_name),
             )
             con.commit()
-        finally:
-            con.close()
         
         return file_hash
     
@@ -603,16 +1028,13 @@ class MediaRepository(BaseRepository):
             file_hash: Hash del archivo
             added_at: Timestamp
         """
-        con = self._connect()
-        try:
+        with self._session() as con:
             con.execute(
                 """INSERT OR REPLACE INTO url_to_media(url, hash, added_at) 
                    VALUES (?,?,?)""",
                 (url, file_hash, added_at),
             )
             con.commit()
-        finally:
-            con.close()
     
     def get_by_url(self, url: str) -> Optional[MediaInfo]:
         """
@@ -624,8 +1046,7 @@ class MediaRepository(BaseRepository):
         Returns:
             MediaInfo si se encuentra
         """
-        con = self._connect()
-        try:
+        with self._session() as con:
             cur = con.execute(
                 "SELECT hash FROM url_to_media WHERE url=?", (url,)
             )
@@ -652,8 +1073,6 @@ class MediaRepository(BaseRepository):
                 size_bytes=row2[4],
                 created_at=row2[5],
             )
-        finally:
-            con.close()
 
 
 # Instancias globales de repositorios
@@ -45,7 +45,7 @@ async def trigger_cleanup(request: CleanupRequest):
     try:
         if "all" in request.targets or len(request.targets) == 0:
             # Limpieza completa
-            summary = cleanup_service.cleanup_all(
+            summary = await cleanup_service.cleanup_all_async(
                 strategy=request.strategy,
                 dry_run=request.dry_run
             )
@@ -107,18 +107,21 @@ async def trigger_cleanup(request: CleanupRequest):
 
 
 @router.get("/storage/stats", response_model=StorageStats, dependencies=[Depends(check_admin_enabled)])
-async def get_storage_stats():
+async def get_storage_stats(detailed: bool = False):
     """
     Obtiene estadísticas de almacenamiento del servidor.
     
     Solo disponible en desarrollo/testing.
     Muestra el uso actual de espacio en disco.
     
+    Args:
+        detailed: Si es True, vuelve a recorrer los directorios para los tamaños y conteos
+        
     Returns:
         StorageStats con información de almacenamiento
     """
     try:
-        stats = cleanup_service.get_storage_stats()
+        stats = cleanup_service.get_storage_stats(detailed=detailed)
         return stats
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get stats: {str(e)}")
@@ -14,6 +14,7 @@ from ..managers import file_manager, metadata_manager, job_manager
 from ..validators import URLValidator, QualityValidator, FormatValidator
 from ..helpers import DateTimeHelper
 from ..core.config import settings
+from ..core.enums import DownloadSource
 from ..core.exceptions import InvalidURLException, InvalidQualityException, InvalidFormatException
 
 
@@ -174,8 +175,8 @@ def download_endpoint(payload: DownloadRequest, background_tasks: BackgroundTask
             except InvalidQualityException as e:
                 raise HTTPException(status_code=400, detail=str(e))
         
-        # Verificar disponibilidad primero
-        availability = download_orchestrator.check_availability(
+        # Reusar o iniciar la descarga en una sola transacción
+        availability = download_orchestrator.ensure_download(
             url=url,
             media_type="audio",
             quality=normalized_quality,
@@ -199,19 +200,11 @@ def download_endpoint(payload: DownloadRequest, background_tasks: BackgroundTask
                 "url": url,
             })
         
-        # Iniciar nueva descarga
-        result = download_orchestrator.initiate_download(
-            url=url,
-            media_type="audio",
-            quality=normalized_quality,
-            format_=None
-        )
-        
         return JSONResponse(status_code=202, content={
             "message": "Descarga encolada",
-            "job_id": result["job_id"],
+            "job_id": availability.job_id,
             "url": url,
-            "source": result["source"],
+            "source": availability.source,
         })
         
     except HTTPException:
@@ -241,12 +234,13 @@ def download_video(payload: VideoDownloadRequest, background_tasks: BackgroundTa
         except InvalidFormatException as e:
             raise HTTPException(status_code=400, detail=str(e))
         
-        # Verificar disponibilidad
-        availability = download_orchestrator.check_availability(
+        # Reusar o iniciar la descarga en una sola transacción
+        availability = download_orchestrator.ensure_download(
             url=url,
             media_type="video",
             quality=None,
-            format_=video_format
+            format_=video_format,
+            source=DownloadSource.YOUTUBE
         )
         
         if availability.status == "ready":
@@ -269,17 +263,9 @@ def download_video(payload: VideoDownloadRequest, background_tasks: BackgroundTa
                 "source": "youtube_video",
             })
         
-        # Iniciar nueva descarga
-        result = download_orchestrator.initiate_download(
-            url=url,
-            media_type="video",
-            quality=None,
-            format_=video_format
-        )
-        
         return JSONResponse(status_code=202, content={
             "message": "Descarga encolada",
-            "job_id": result["job_id"],
+            "job_id": availability.job_id,
             "url": url,
             "source": "youtube_video",
         })
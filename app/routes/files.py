@@ -11,6 +11,7 @@ from fastapi.responses import FileResponse
 from starlette.background import BackgroundTask
 
 from ..managers import file_manager, metadata_manager
+from ..repositories import download_index_repo
 from ..core.config import settings
 from ..core.exceptions import FileNotFoundException, JobNotFoundException
 from ..helpers import FileNameHelper
@@ -75,6 +76,8 @@ def _serve_file_response(job_id: str, filename: str):
     file_path = _Path(file_path_str)
     
     if not file_path.exists():
+        # El índice deja de ofrecer como reutilizable toda entrada con este archivo
+        download_index_repo.mark_missing_file(file_path_str)
         raise FileNotFoundException(filename=filename, path=str(file_path), context="Archivo no existe en disco")
     
     # Verificar que está bajo downloads/ (seguridad)
@@ -246,4 +246,7 @@ class StorageStats(BaseModel):
     total_size_mb: float = Field(..., description="Tamaño total en MB")
     database_size_mb: float = Field(..., description="Tamaño de la BD en MB")
     db_record_count: int = Field(..., description="Cantidad de registros en BD")
+    disk_total_mb: float = Field(..., description="Capacidad del disco de downloads/ en MB")
+    disk_used_mb: float = Field(..., description="Espacio usado en el disco de downloads/ en MB")
+    disk_free_mb: float = Field(..., description="Espacio libre en el disco de downloads/ en MB")
     timestamp: str = Field(..., description="Timestamp de la consulta")
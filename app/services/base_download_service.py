@@ -3,10 +3,12 @@ Servicio base de descarga.
 Define la interfaz común para todos los servicios de descarga.
 """
 import subprocess
-import os
+import re
+import queue
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional, Callable, List
+from typing import Optional, Callable, List, Tuple
+from secrets import token_hex
 import threading
 
 from ..core.config import settings
@@ -17,6 +19,58 @@ from ..helpers import DateTimeHelper, TextHelper
 from ..repositories import download_index_repo, media_repo
 
 
+# Patrones de resumen en la salida de yt-dlp/spotdl, en orden de prioridad
+_SUMMARY_PATTERNS = tuple(re.compile(p) for p in (
+    r"Downloaded\s+\d+\s+tracks",
+    r"Downloaded\s+\d+\s+files?",
+    r"Merged",
+    r"Destination:\s+",
+))
+
+# Cola de registro en catálogo: (job_id, file_info, url, finished_at, quality, format_)
+_catalog_queue: "queue.Queue[Tuple]" = queue.Queue()
+_catalog_worker: Optional[threading.Thread] = None
+_catalog_worker_lock = threading.Lock()
+
+
+def _catalog_worker_loop() -> None:
+    """Consume la cola de registro en catálogo fuera del hilo de descarga."""
+    while True:
+        job_id, file_info, url, finished_at, quality, format_ = _catalog_queue.get()
+        try:
+            file_path = Path(file_info.path)
+            file_hash = media_repo.upsert_media(
+                file_path,
+                finished_at,
+                quality,
+                format_,
+                file_path.stem
+            )
+            media_repo.map_url_to_hash(url, file_hash, finished_at)
+        except Exception as e:
+            # No fallar si el registro en catálogo falla, pero dejar constancia
+            print(f"JOB {job_id} CATALOG failed url={url} file={file_info.path} error={e}")
+        finally:
+            _catalog_queue.task_done()
+
+
+def _enqueue_catalog_registration(item: Tuple) -> None:
+    """Encola un archivo para registrarlo en el catálogo, iniciando el worker si hace falta."""
+    global _catalog_worker
+    
+    if _catalog_worker is None:
+        with _catalog_worker_lock:
+            if _catalog_worker is None:
+                _catalog_worker = threading.Thread(
+                    target=_catalog_worker_loop,
+                    name="catalog-registration",
+                    daemon=True
+                )
+                _catalog_worker.start()
+    
+    _catalog_queue.put(item)
+
+
 class BaseDownloadService(ABC):
     """
     Servicio base abstracto para descargas.
@@ -113,6 +167,10 @@ class BaseDownloadService(ABC):
         """
         Ejecuta la descarga de forma síncrona (template method).
         
+        No deduplica: quien lanza el job (DownloadOrchestrator.ensure_download,
+        vía DownloadIndexRepository.ensure_or_start) ya garantiza un único job
+        por URL, calidad y formato.
+        
         Args:
             url: URL a descargar
             job_id: ID del job (se genera si no se proporciona)
@@ -144,13 +202,15 @@ class BaseDownloadService(ABC):
                 # Construir comando
                 command = self.build_command(url, paths["temp_dir"], **kwargs)
                 
-                # Ejecutar proceso
+                # Ejecutar proceso. start_new_session equivale a os.setsid en el
+                # hijo (grupo propio para killpg) sin preexec_fn, que obliga a
+                # CPython a usar fork en lugar de vfork/posix_spawn
                 process = subprocess.Popen(
                     command,
                     stdout=subprocess.PIPE,
                     stderr=subprocess.STDOUT,
                     text=True,
-                    preexec_fn=os.setsid,
+                    start_new_session=True,
                 )
                 
                 self.job_manager.register_job(job_id, process)
@@ -217,8 +277,7 @@ class BaseDownloadService(ABC):
     
     def _generate_job_id(self) -> str:
         """Genera un ID único para el job."""
-        import uuid
-        return uuid.uuid4().hex[:8]
+        return token_hex(4)
     
     def _prepare_paths(self, job_id: str, **kwargs) -> dict:
         """
@@ -324,7 +383,7 @@ class BaseDownloadService(ABC):
             started_at=started_at,
             finished_at=finished_at,
             status=status,
-            files=[f.dict() for f in moved_files],
+            files=moved_files,
             log_path=str(log_path),
             error=error,
             inferred_from_filenames=False,
@@ -340,17 +399,8 @@ class BaseDownloadService(ABC):
     
     def _extract_summary(self, output: str) -> Optional[str]:
         """Extrae un resumen de la salida del comando."""
-        import re
-        
-        patterns = [
-            r"Downloaded\s+\d+\s+tracks",
-            r"Downloaded\s+\d+\s+files?",
-            r"Merged",
-            r"Destination:\s+",
-        ]
-        
-        for pattern in patterns:
-            m = re.search(pattern, output)
+        for pattern in _SUMMARY_PATTERNS:
+            m = pattern.search(output)
             if m:
                 return m.group(0)
         
@@ -370,24 +420,14 @@ class BaseDownloadService(ABC):
         # Registrar en índice
         self.download_index.register_success(job_id, file_paths)
         
-        # Registrar en catálogo de media
+        # Registrar en catálogo de media (en background)
         quality = kwargs.get("quality")
         format_ = kwargs.get("format")
         
-        try:
-            for file_info in moved_files:
-                file_path = Path(file_info.path)
-                file_hash = self.media_repo.upsert_media(
-                    file_path,
-                    finished_at,
-                    quality,
-                    format_,
-                    file_path.stem
-                )
-                self.media_repo.map_url_to_hash(url, file_hash, finished_at)
-        except Exception:
-            # No fallar si el registro en catálogo falla
-            pass
+        for file_info in moved_files:
+            _enqueue_catalog_registration(
+                (job_id, file_info, url, finished_at, quality, format_)
+            )
     
     def _handle_validation_error(
         self,
@@ -2,13 +2,21 @@
 Servicio de limpieza y optimización del servidor.
 Implementa limpieza automática de archivos antiguos y huérfanos.
 """
+import asyncio
+import atexit
+import calendar
 import logging
+import logging.handlers
+import os
+import queue
+import re
 import shutil
-import json
 import time
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Iterator, Iterable, Optional, Callable
+from collections import Counter
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from ..core.config import settings, cleanup_settings
 from ..core.enums import CleanupTarget, CleanupStrategy
@@ -17,6 +25,180 @@ from ..repositories import download_index_repo, media_repo
 from ..helpers import DateTimeHelper
 
 
+# Extrae created_at de un meta-*.json sin construir el dict completo
+_CREATED_AT_PATTERN = re.compile(rb'"created_at"\s*:\s*"([^"]{1,64})"')
+
+# Vigencia de los resúmenes de árbol usados por get_storage_stats
+_TREE_SUMMARY_TTL_SECONDS = 30
+
+
+def _parse_iso_epoch(timestamp_str: str) -> Optional[float]:
+    """
+    Convierte un timestamp YYYY-MM-DDTHH:MM:SS[.fff][Z|±hh:mm] a epoch.
+    
+    Los timestamps sin zona horaria se interpretan en hora local, igual que
+    datetime.fromisoformat comparado con datetime.now().
+    
+    Args:
+        timestamp_str: Timestamp ISO 8601
+        
+    Returns:
+        Segundos desde epoch, o None si el formato no coincide
+    """
+    s = timestamp_str
+    if len(s) < 19 or s[4] != '-' or s[7] != '-' or s[10] not in 'T ' or s[13] != ':' or s[16] != ':':
+        return None
+    try:
+        fields = (int(s[0:4]), int(s[5:7]), int(s[8:10]), int(s[11:13]), int(s[14:16]), int(s[17:19]))
+        rest = s[19:]
+        fraction = 0.0
+        if rest[:1] == '.':
+            end = 1
+            while end < len(rest) and rest[end].isdigit():
+                end += 1
+            fraction = float(rest[:end])
+            rest = rest[end:]
+        
+        if rest == 'Z':
+            return calendar.timegm(fields) + fraction
+        if not rest:
+            return time.mktime(fields + (0, 0, -1)) + fraction
+        if len(rest) == 6 and rest[0] in '+-' and rest[3] == ':':
+            offset = int(rest[1:3]) * 3600 + int(rest[4:6]) * 60
+            if rest[0] == '-':
+                offset = -offset
+            return calendar.timegm(fields) - offset + fraction
+    except ValueError:
+        return None
+    return None
+
+
+class _CachedTimeFormatter(logging.Formatter):
+    """
+    Formatter que reutiliza el timestamp formateado dentro del mismo segundo.
+    
+    datefmt no incluye fracciones de segundo, así que todos los registros de
+    un mismo segundo comparten el resultado de localtime + strftime.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cached_second = None
+        self._cached_time = ""
+    
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        second = int(record.created)
+        if second != self._cached_second:
+            self._cached_time = super().formatTime(record, datefmt)
+            self._cached_second = second
+        return self._cached_time
+
+
+# Resúmenes recientes por raíz: ruta -> (ventana de tiempo, resumen)
+_TREE_SUMMARIES: Dict[str, Tuple[int, Tuple[int, int, int]]] = {}
+
+
+def _walk_tree(root: str) -> Tuple[int, int, int]:
+    """
+    Recorre un árbol con os.scandir una sola vez, sin caché.
+    
+    Args:
+        root: Directorio raíz
+        
+    Returns:
+        Tupla (bytes totales, cantidad de archivos, cantidad de directorios)
+    """
+    total_bytes = 0
+    file_count = 0
+    dir_count = 0
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            dir_count += 1
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            total_bytes += entry.stat().st_size
+                            file_count += 1
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total_bytes, file_count, dir_count
+
+
+def _fast_rmtree(path: str, dir_fd: Optional[int] = None) -> None:
+    """
+    Elimina un directorio recursivamente trabajando con descriptores.
+    
+    Usa el tipo de entrada del readdir para no hacer lstat sobre archivos
+    regulares y elimina cada entrada por nombre relativo a su directorio.
+    
+    Args:
+        path: Ruta del directorio (relativa a dir_fd si se indica)
+        dir_fd: Descriptor del directorio padre
+    """
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW, dir_fd=dir_fd)
+    try:
+        with os.scandir(fd) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    _fast_rmtree(entry.name, fd)
+                else:
+                    os.unlink(entry.name, dir_fd=fd)
+    finally:
+        os.close(fd)
+    os.rmdir(path, dir_fd=dir_fd)
+
+
+class _DirFdUnlinker:
+    """
+    Elimina archivos por nombre relativo a un descriptor del directorio padre.
+    
+    Mantiene abierto el directorio mientras los archivos consecutivos
+    compartan padre, evitando resolver la ruta completa en cada unlink.
+    Los directorios con un único archivo a borrar usan unlink por ruta:
+    abrir y cerrar el descriptor costaría más que lo que ahorra.
+    """
+    
+    def __init__(self, file_paths: Optional[Iterable[str]] = None):
+        self._dir_path = None
+        self._dir_fd = None
+        self._batch_sizes = (
+            Counter(os.path.dirname(path) for path in file_paths)
+            if file_paths is not None else None
+        )
+    
+    def unlink(self, file_path: str) -> None:
+        """Elimina un archivo reutilizando el descriptor de su directorio."""
+        dir_path, name = os.path.split(file_path)
+        if self._batch_sizes is not None and self._batch_sizes[dir_path] <= 1:
+            os.unlink(file_path)
+            return
+        if dir_path != self._dir_path:
+            self.close()
+            self._dir_fd = os.open(dir_path, os.O_RDONLY | os.O_DIRECTORY)
+            self._dir_path = dir_path
+        os.unlink(name, dir_fd=self._dir_fd)
+    
+    def close(self) -> None:
+        """Cierra el descriptor abierto, si lo hay."""
+        if self._dir_fd is not None:
+            os.close(self._dir_fd)
+        self._dir_fd = None
+        self._dir_path = None
+    
+    def __enter__(self) -> "_DirFdUnlinker":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
 class CleanupService:
     """
     Servicio de limpieza y optimización del servidor.
@@ -53,15 +235,26 @@ class CleanupService:
         console_handler.setLevel(logging.INFO)
         
         # Formato detallado
-        formatter = logging.Formatter(
+        formatter = _CachedTimeFormatter(
             '[%(asctime)s] %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
         
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        # Los hilos de limpieza solo encolan registros; un único listener
+        # escribe en archivo y consola manteniendo el orden
+        log_queue = queue.SimpleQueue()
+        self._log_listener = logging.handlers.QueueListener(
+            log_queue,
+            file_handler,
+            console_handler,
+            respect_handler_level=True
+        )
+        self._log_listener.start()
+        atexit.register(self._log_listener.stop)
+        
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
         
         return logger
     
@@ -84,93 +277,86 @@ class CleanupService:
             dry_run = cleanup_settings.CLEANUP_DRY_RUN
         
         start_time = time.time()
-        self.logger.info("=" * 60)
-        self.logger.info("CLEANUP STARTED")
-        self.logger.info("=" * 60)
-        self.logger.info(f"Config: retention={cleanup_settings.RETENTION_HOURS}h, dry_run={dry_run}")
-        self.logger.info("")
+        self._log_cleanup_started(dry_run)
         
-        targets_cleaned = []
-        total_files = 0
-        total_space = 0.0
         errors = []
         
-        # 1. Limpiar downloads
-        try:
-            stats = self.cleanup_downloads(strategy, dry_run)
-            targets_cleaned.append(stats)
-            total_files += stats.files_deleted
-            total_space += stats.space_freed_mb
-        except Exception as e:
-            error_msg = f"Error en limpieza de downloads: {str(e)}"
-            self.logger.error(error_msg)
-            errors.append(error_msg)
+        # 1-4. Limpiar downloads, logs, metadata y temp en paralelo
+        # (subárboles disjuntos, trabajo dominado por stat/unlink)
+        phases = self._filesystem_phases(strategy, dry_run)
+        results = {}
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix="cleanup") as executor:
+            futures = {executor.submit(phase): name for name, phase in phases.items()}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    error_msg = f"Error en limpieza de {name}: {str(e)}"
+                    self.logger.error(error_msg)
+                    errors.append(error_msg)
         
-        # 2. Limpiar logs
+        # 5. Limpiar base de datos (serial: toca SQLite)
         try:
-            stats = self.cleanup_logs(cleanup_settings.RETENTION_HOURS, dry_run)
-            targets_cleaned.append(stats)
-            total_files += stats.files_deleted
-            total_space += stats.space_freed_mb
+            results["database"] = self.cleanup_database(cleanup_settings.RETENTION_HOURS, dry_run)
         except Exception as e:
-            error_msg = f"Error en limpieza de logs: {str(e)}"
+            error_msg = f"Error en limpieza de database: {str(e)}"
             self.logger.error(error_msg)
             errors.append(error_msg)
         
-        # 3. Limpiar metadata
-        try:
-            stats = self.cleanup_metadata(cleanup_settings.RETENTION_HOURS, dry_run)
-            targets_cleaned.append(stats)
-            total_files += stats.files_deleted
-            total_space += stats.space_freed_mb
-        except Exception as e:
-            error_msg = f"Error en limpieza de metadata: {str(e)}"
-            self.logger.error(error_msg)
-            errors.append(error_msg)
+        return self._build_summary(start_time, list(phases) + ["database"], results, errors, dry_run)
+    
+    async def cleanup_all_async(
+        self,
+        strategy: str = "age_based",
+        dry_run: bool = None
+    ) -> CleanupSummary:
+        """
+        Versión asíncrona de cleanup_all para usar desde endpoints.
         
-        # 4. Limpiar temp
-        try:
-            stats = self.cleanup_temp(dry_run)
-            targets_cleaned.append(stats)
-            total_files += stats.files_deleted
-            total_space += stats.space_freed_mb
-        except Exception as e:
-            error_msg = f"Error en limpieza de temp: {str(e)}"
-            self.logger.error(error_msg)
-            errors.append(error_msg)
+        Las fases de sistema de archivos se ejecutan como tareas concurrentes
+        en hilos sin bloquear el event loop; la base de datos se limpia
+        después en una sola tarea.
+        
+        Args:
+            strategy: Estrategia de limpieza
+            dry_run: Si es True, solo simula. Si es None, usa configuración
+            
+        Returns:
+            CleanupSummary con resultados
+        """
+        if dry_run is None:
+            dry_run = cleanup_settings.CLEANUP_DRY_RUN
+        
+        start_time = time.time()
+        self._log_cleanup_started(dry_run)
+        
+        errors = []
+        
+        phases = self._filesystem_phases(strategy, dry_run)
+        outcomes = await asyncio.gather(
+            *(asyncio.to_thread(phase) for phase in phases.values()),
+            return_exceptions=True
+        )
+        results = {}
+        for name, outcome in zip(phases, outcomes):
+            if isinstance(outcome, Exception):
+                error_msg = f"Error en limpieza de {name}: {str(outcome)}"
+                self.logger.error(error_msg)
+                errors.append(error_msg)
+            else:
+                results[name] = outcome
         
-        # 5. Limpiar base de datos
         try:
-            stats = self.cleanup_database(cleanup_settings.RETENTION_HOURS, dry_run)
-            targets_cleaned.append(stats)
-            total_files += stats.files_deleted
-            total_space += stats.space_freed_mb
+            results["database"] = await asyncio.to_thread(
+                self.cleanup_database, cleanup_settings.RETENTION_HOURS, dry_run
+            )
         except Exception as e:
             error_msg = f"Error en limpieza de database: {str(e)}"
             self.logger.error(error_msg)
             errors.append(error_msg)
         
-        duration = time.time() - start_time
-        
-        self.logger.info("")
-        self.logger.info("=" * 60)
-        self.logger.info("CLEANUP COMPLETED")
-        self.logger.info("=" * 60)
-        self.logger.info(f"Total files deleted: {total_files}")
-        self.logger.info(f"Total space freed: {total_space:.2f} MB")
-        self.logger.info(f"Duration: {duration:.2f} seconds")
-        if errors:
-            self.logger.warning(f"Errors encountered: {len(errors)}")
-        
-        return CleanupSummary(
-            total_files_deleted=total_files,
-            total_space_freed_mb=round(total_space, 2),
-            targets_cleaned=targets_cleaned,
-            errors=errors,
-            timestamp=DateTimeHelper.now_iso(),
-            duration_seconds=round(duration, 2),
-            dry_run=dry_run
-        )
+        return self._build_summary(start_time, list(phases) + ["database"], results, errors, dry_run)
     
     def cleanup_downloads(
         self,
@@ -197,50 +383,19 @@ class CleanupService:
         space_freed = 0
         errors = []
         
-        # Escanear downloads/audio/ y downloads/video/
+        # Escanear downloads/audio/ y downloads/video/. En serie: cleanup_all ya
+        # ejecuta esta fase en paralelo con las demás
         for media_dir in [settings.DOWNLOAD_DIR / "audio", settings.DOWNLOAD_DIR / "video"]:
             if not media_dir.exists():
                 continue
-            
-            self.logger.info(f"Scanning: {media_dir}")
-            
-            # Obtener todos los archivos
-            all_files = []
-            for file_path in media_dir.rglob("*"):
-                if file_path.is_file():
-                    all_files.append(file_path)
-            
-            self.logger.info(f"Found: {len(all_files)} files")
-            
-            # Filtrar archivos elegibles para eliminación
-            eligible_files = self._get_files_by_age(
-                all_files,
-                cleanup_settings.RETENTION_HOURS
-            )
-            
-            self.logger.info(f"Eligible for deletion: {len(eligible_files)} files (older than {cleanup_settings.RETENTION_HOURS}h)")
-            
-            # Eliminar archivos
-            for file_path in eligible_files:
-                try:
-                    age_hours = self._get_file_age_hours(file_path)
-                    size_mb = file_path.stat().st_size / (1024 * 1024)
-                    
-                    self.logger.info(f"DELETE: {file_path} (age: {age_hours:.1f}h, size: {size_mb:.2f}MB)")
-                    
-                    if not dry_run:
-                        file_path.unlink()
-                        files_deleted += 1
-                        space_freed += size_mb
-                    else:
-                        files_deleted += 1
-                        space_freed += size_mb
-                except Exception as e:
-                    error_msg = f"Error deleting {file_path}: {str(e)}"
-                    self.logger.error(error_msg)
-                    errors.append(error_msg)
+            dir_deleted, dir_freed, dir_errors = self._cleanup_media_dir(media_dir, dry_run)
+            files_deleted += dir_deleted
+            space_freed += dir_freed
+            errors.extend(dir_errors)
         
         duration = time.time() - start_time
+        if not dry_run:
+            _TREE_SUMMARIES.clear()
         self.logger.info(f"Deleted: {files_deleted} files, freed: {space_freed:.2f} MB")
         self.logger.info("")
         
@@ -255,6 +410,63 @@ class CleanupService:
             errors=errors
         )
     
+    def _cleanup_media_dir(
+        self,
+        media_dir: Path,
+        dry_run: bool
+    ) -> Tuple[int, float, List[str]]:
+        """
+        Limpia archivos antiguos de un directorio de medios.
+        
+        Args:
+            media_dir: Directorio a escanear (downloads/audio o downloads/video)
+            dry_run: Si es True, solo simula
+            
+        Returns:
+            Tupla (archivos eliminados, MB liberados, errores)
+        """
+        files_deleted = 0
+        space_freed = 0
+        errors = []
+        
+        self.logger.info(f"Scanning: {media_dir}")
+        
+        # Obtener todos los archivos con su tamaño y mtime (un solo stat por archivo)
+        all_files = list(self._scan_files(media_dir))
+        
+        self.logger.info(f"Found: {len(all_files)} files in {media_dir}")
+        
+        # Filtrar archivos elegibles para eliminación
+        eligible_files = self._get_files_by_age(
+            all_files,
+            cleanup_settings.RETENTION_HOURS
+        )
+        
+        self.logger.info(f"Eligible for deletion: {len(eligible_files)} files in {media_dir} (older than {cleanup_settings.RETENTION_HOURS}h)")
+        
+        # Eliminar archivos (agrupados por directorio gracias al orden del recorrido)
+        with _DirFdUnlinker(path for path, _, _ in eligible_files) as unlinker:
+            for file_path, size_bytes, age_hours in eligible_files:
+                try:
+                    size_mb = size_bytes / (1024 * 1024)
+                    
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug(f"DELETE: {file_path} (age: {age_hours:.1f}h, size: {size_mb:.2f}MB)")
+                    
+                    if not dry_run:
+                        unlinker.unlink(file_path)
+                        files_deleted += 1
+                        space_freed += size_mb
+                    else:
+                        files_deleted += 1
+                        space_freed += size_mb
+                except Exception as e:
+                    error_msg = f"Error deleting {file_path}: {str(e)}"
+                    self.logger.error(error_msg)
+                    errors.append(error_msg)
+        
+        return files_deleted, space_freed, errors
+    
     def cleanup_logs(
         self,
         max_age_hours: float,
@@ -274,6 +486,8 @@ class CleanupService:
             dry_run = cleanup_settings.CLEANUP_DRY_RUN
         
         start_time = time.time()
+        now = start_time
+        threshold_mtime = now - max_age_hours * 3600
         self.logger.info("--- LOGS CLEANUP ---")
         
         files_deleted = 0
@@ -291,25 +505,25 @@ class CleanupService:
             job_dirs = [d for d in source_dir.iterdir() if d.is_dir()]
             self.logger.info(f"Found: {len(job_dirs)} log directories")
             
-            # Filtrar elegibles
+            # Filtrar elegibles (conservando la edad calculada)
             eligible_dirs = []
             for job_dir in job_dirs:
-                age_hours = self._get_dir_age_hours(job_dir)
-                if age_hours > max_age_hours:
-                    eligible_dirs.append(job_dir)
+                mtime = job_dir.stat().st_mtime
+                if mtime < threshold_mtime:
+                    eligible_dirs.append((job_dir, (now - mtime) / 3600))
             
             self.logger.info(f"Eligible for deletion: {len(eligible_dirs)} directories")
             
             # Eliminar directorios
-            for job_dir in eligible_dirs:
+            for job_dir, age_hours in eligible_dirs:
                 try:
-                    age_hours = self._get_dir_age_hours(job_dir)
                     size_mb = self._get_dir_size(job_dir) / (1024 * 1024)
                     
-                    self.logger.info(f"DELETE: {job_dir} (age: {age_hours:.1f}h, size: {size_mb:.2f}MB)")
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug(f"DELETE: {job_dir} (age: {age_hours:.1f}h, size: {size_mb:.2f}MB)")
                     
                     if not dry_run:
-                        shutil.rmtree(job_dir)
+                        _fast_rmtree(os.fspath(job_dir))
                         files_deleted += 1
                         space_freed += size_mb
                     else:
@@ -321,6 +535,8 @@ class CleanupService:
                     errors.append(error_msg)
         
         duration = time.time() - start_time
+        if not dry_run:
+            _TREE_SUMMARIES.clear()
         self.logger.info(f"Deleted: {files_deleted} directories, freed: {space_freed:.2f} MB")
         self.logger.info("")
         
@@ -354,6 +570,8 @@ class CleanupService:
             dry_run = cleanup_settings.CLEANUP_DRY_RUN
         
         start_time = time.time()
+        now = start_time
+        threshold_mtime = now - max_age_hours * 3600
         self.logger.info("--- METADATA CLEANUP ---")
         
         files_deleted = 0
@@ -376,52 +594,64 @@ class CleanupService:
         self.logger.info(f"Scanning: {settings.META_DIR}")
         
         # Obtener archivos de metadata
-        meta_files = list(settings.META_DIR.glob("meta-*.json"))
+        meta_files = self._list_meta_files()
         self.logger.info(f"Found: {len(meta_files)} metadata files")
         
         # Filtrar por edad
         eligible_files = []
         for meta_file in meta_files:
             try:
-                # Leer created_at del JSON
-                with open(meta_file, 'r') as f:
-                    data = json.load(f)
-                    created_at = data.get('created_at')
-                    
-                    if created_at:
-                        age_hours = self._get_age_from_timestamp(created_at)
-                        if age_hours > max_age_hours:
-                            eligible_files.append((meta_file, age_hours))
-                    else:
-                        # Si no tiene created_at, usar mtime
-                        age_hours = self._get_file_age_hours(meta_file)
-                        if age_hours > max_age_hours:
-                            eligible_files.append((meta_file, age_hours))
-            except Exception as e:
-                self.logger.warning(f"Error reading {meta_file}: {str(e)}")
-        
-        self.logger.info(f"Eligible for deletion: {len(eligible_files)} files")
-        
-        # Eliminar archivos
-        for meta_file, age_hours in eligible_files:
-            try:
-                size_mb = meta_file.stat().st_size / (1024 * 1024)
+                # Un solo stat por archivo: tamaño y mtime se reutilizan después
+                st = meta_file.stat()
+                
+                # created_at nunca es posterior al mtime (el archivo se escribe al
+                # crear el job), así que un mtime vencido basta sin abrir el archivo
+                if st.st_mtime < threshold_mtime:
+                    eligible_files.append((meta_file, st.st_size, (now - st.st_mtime) / 3600))
+                    continue
                 
-                self.logger.info(f"DELETE: {meta_file.name} (age: {age_hours:.1f}h, size: {size_mb:.3f}MB)")
+                # mtime reciente: leer created_at del JSON como bytes por si el
+                # archivo se reescribió con contenido antiguo
+                with open(meta_file, 'rb') as f:
+                    match = _CREATED_AT_PATTERN.search(f.read())
                 
-                if not dry_run:
-                    meta_file.unlink()
-                    files_deleted += 1
-                    space_freed += size_mb
+                if match:
+                    age_hours = self._get_age_from_timestamp(match.group(1).decode("ascii", "replace"), now)
                 else:
-                    files_deleted += 1
-                    space_freed += size_mb
+                    # Si no tiene created_at, usar mtime
+                    age_hours = (now - st.st_mtime) / 3600
+                
+                if age_hours > max_age_hours:
+                    eligible_files.append((meta_file, st.st_size, age_hours))
             except Exception as e:
-                error_msg = f"Error deleting {meta_file}: {str(e)}"
-                self.logger.error(error_msg)
-                errors.append(error_msg)
+                self.logger.warning(f"Error reading {meta_file.path}: {str(e)}")
+        
+        self.logger.info(f"Eligible for deletion: {len(eligible_files)} files")
+        
+        # Eliminar archivos (todos comparten el directorio de metadata)
+        with _DirFdUnlinker(meta_file.path for meta_file, _, _ in eligible_files) as unlinker:
+            for meta_file, size_bytes, age_hours in eligible_files:
+                try:
+                    size_mb = size_bytes / (1024 * 1024)
+                    
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug(f"DELETE: {meta_file.name} (age: {age_hours:.1f}h, size: {size_mb:.3f}MB)")
+                    
+                    if not dry_run:
+                        unlinker.unlink(meta_file.path)
+                        files_deleted += 1
+                        space_freed += size_mb
+                    else:
+                        files_deleted += 1
+                        space_freed += size_mb
+                except Exception as e:
+                    error_msg = f"Error deleting {meta_file.path}: {str(e)}"
+                    self.logger.error(error_msg)
+                    errors.append(error_msg)
         
         duration = time.time() - start_time
+        if not dry_run:
+            _TREE_SUMMARIES.clear()
         self.logger.info(f"Deleted: {files_deleted} files, freed: {space_freed:.3f} MB")
         self.logger.info("")
         
@@ -453,6 +683,8 @@ class CleanupService:
             dry_run = cleanup_settings.CLEANUP_DRY_RUN
         
         start_time = time.time()
+        now = start_time
+        threshold_mtime = now - cleanup_settings.TEMP_RETENTION_HOURS * 3600
         self.logger.info("--- TEMP CLEANUP ---")
         
         files_deleted = 0
@@ -479,37 +711,65 @@ class CleanupService:
             if not temp_subdir.exists():
                 continue
             
-            # Obtener todos los items
-            items = list(temp_subdir.rglob("*"))
-            
-            for item in items:
-                try:
-                    age_hours = self._get_file_age_hours(item) if item.is_file() else self._get_dir_age_hours(item)
-                    
-                    # Usar retención más corta para temporales
-                    if age_hours > cleanup_settings.TEMP_RETENTION_HOURS:
-                        if item.is_file():
-                            size_mb = item.stat().st_size / (1024 * 1024)
-                            self.logger.info(f"DELETE: {item} (age: {age_hours:.1f}h, size: {size_mb:.2f}MB)")
-                            
-                            if not dry_run:
-                                item.unlink()
-                            files_deleted += 1
-                            space_freed += size_mb
-                        elif item.is_dir():
-                            size_mb = self._get_dir_size(item) / (1024 * 1024)
-                            self.logger.info(f"DELETE DIR: {item} (age: {age_hours:.1f}h, size: {size_mb:.2f}MB)")
+            # Recorrer de arriba hacia abajo: los directorios antiguos se eliminan
+            # completos y se podan para no descender en ellos. fwalk entrega un
+            # descriptor por directorio para hacer stat/unlink por nombre.
+            temp_root = os.fspath(temp_subdir)
+            for dirpath, dirnames, filenames, dir_fd in os.fwalk(temp_subdir, topdown=True):
+                # Los hijos de <source>/<media_type>/ son directorios de staging
+                # de un job (FileManager): solo reciben archivos mientras el job
+                # corre, así que si son recientes no se listan
+                job_level = temp_subdir.name != "archives" and os.path.dirname(dirpath) == temp_root
+                kept_dirs = []
+                for name in dirnames:
+                    dir_path = os.path.join(dirpath, name)
+                    try:
+                        mtime = os.stat(name, dir_fd=dir_fd).st_mtime
+                        
+                        # Usar retención más corta para temporales
+                        if mtime >= threshold_mtime:
+                            if not job_level:
+                                kept_dirs.append(name)
+                            continue
+                        
+                        age_hours = (now - mtime) / 3600
+                        size_mb = self._get_dir_size(Path(dir_path)) / (1024 * 1024)
+                        if self.logger.isEnabledFor(logging.DEBUG):
+                            self.logger.debug(f"DELETE DIR: {dir_path} (age: {age_hours:.1f}h, size: {size_mb:.2f}MB)")
+                        
+                        if not dry_run:
+                            _fast_rmtree(name, dir_fd)
+                        files_deleted += 1
+                        space_freed += size_mb
+                    except Exception as e:
+                        error_msg = f"Error deleting {dir_path}: {str(e)}"
+                        self.logger.error(error_msg)
+                        errors.append(error_msg)
+                dirnames[:] = kept_dirs
+                
+                for name in filenames:
+                    file_path = os.path.join(dirpath, name)
+                    try:
+                        st = os.stat(name, dir_fd=dir_fd)
+                        
+                        if st.st_mtime < threshold_mtime:
+                            age_hours = (now - st.st_mtime) / 3600
+                            size_mb = st.st_size / (1024 * 1024)
+                            if self.logger.isEnabledFor(logging.DEBUG):
+                                self.logger.debug(f"DELETE: {file_path} (age: {age_hours:.1f}h, size: {size_mb:.2f}MB)")
                             
                             if not dry_run:
-                                shutil.rmtree(item)
+                                os.unlink(name, dir_fd=dir_fd)
                             files_deleted += 1
                             space_freed += size_mb
-                except Exception as e:
-                    error_msg = f"Error deleting {item}: {str(e)}"
-                    self.logger.error(error_msg)
-                    errors.append(error_msg)
+                    except Exception as e:
+                        error_msg = f"Error deleting {file_path}: {str(e)}"
+                        self.logger.error(error_msg)
+                        errors.append(error_msg)
         
         duration = time.time() - start_time
+        if not dry_run:
+            _TREE_SUMMARIES.clear()
         self.logger.info(f"Deleted: {files_deleted} items, freed: {space_freed:.2f} MB")
         self.logger.info("")
         
@@ -585,23 +845,24 @@ class CleanupService:
             errors=errors
         )
     
-    def get_storage_stats(self) -> StorageStats:
+    def get_storage_stats(self, detailed: bool = False) -> StorageStats:
         """
         Obtiene estadísticas de almacenamiento del servidor.
         
+        Args:
+            detailed: Si es True, recorre cada directorio para obtener tamaños
+                y conteos actuales. Si es False, reutiliza recorridos de los
+                últimos segundos (_TREE_SUMMARY_TTL_SECONDS)
+                
         Returns:
             StorageStats con información actual
         """
-        downloads_size = self._get_dir_size(settings.DOWNLOAD_DIR) if settings.DOWNLOAD_DIR.exists() else 0
-        downloads_count = len(list(settings.DOWNLOAD_DIR.rglob("*"))) if settings.DOWNLOAD_DIR.exists() else 0
-        
-        logs_size = self._get_dir_size(settings.LOGS_DIR) if settings.LOGS_DIR.exists() else 0
-        logs_count = len([d for d in settings.LOGS_DIR.rglob("*") if d.is_dir()]) if settings.LOGS_DIR.exists() else 0
+        mb = 1024 * 1024
         
-        metadata_size = self._get_dir_size(settings.META_DIR) if settings.META_DIR.exists() else 0
-        metadata_count = len(list(settings.META_DIR.glob("meta-*.json"))) if settings.META_DIR.exists() else 0
+        # Uso del disco con un único statvfs
+        disk = shutil.disk_usage(settings.DOWNLOAD_DIR if settings.DOWNLOAD_DIR.exists() else settings.BASE_DIR)
         
-        temp_size = self._get_dir_size(settings.TMP_DIR) if settings.TMP_DIR.exists() else 0
+        metadata_count = len(self._list_meta_files())
         
         db_path = settings.BASE_DIR / "app" / "storage" / "downloads.db"
         db_size = db_path.stat().st_size if db_path.exists() else 0
@@ -612,47 +873,204 @@ class CleanupService:
         except:
             db_record_count = 0
         
+        # Un solo recorrido por raíz: tamaño, archivos y directorios a la vez
+        downloads_size, downloads_count, _ = self._summarize_tree(settings.DOWNLOAD_DIR, fresh=detailed)
+        logs_size, _, logs_count = self._summarize_tree(settings.LOGS_DIR, fresh=detailed)
+        metadata_size, _, _ = self._summarize_tree(settings.META_DIR, fresh=detailed)
+        temp_size, _, _ = self._summarize_tree(settings.TMP_DIR, fresh=detailed)
+        
         return StorageStats(
-            downloads_size_mb=round(downloads_size / (1024 * 1024), 2),
+            downloads_size_mb=round(downloads_size / mb, 2),
             downloads_file_count=downloads_count,
-            logs_size_mb=round(logs_size / (1024 * 1024), 2),
+            logs_size_mb=round(logs_size / mb, 2),
             logs_dir_count=logs_count,
-            metadata_size_mb=round(metadata_size / (1024 * 1024), 3),
+            metadata_size_mb=round(metadata_size / mb, 3),
             metadata_file_count=metadata_count,
-            temp_size_mb=round(temp_size / (1024 * 1024), 2),
-            total_size_mb=round((downloads_size + logs_size + metadata_size + temp_size + db_size) / (1024 * 1024), 2),
-            database_size_mb=round(db_size / (1024 * 1024), 3),
+            temp_size_mb=round(temp_size / mb, 2),
+            total_size_mb=round((downloads_size + logs_size + metadata_size + temp_size + db_size) / mb, 2),
+            database_size_mb=round(db_size / mb, 3),
             db_record_count=db_record_count,
+            disk_total_mb=round(disk.total / mb, 2),
+            disk_used_mb=round(disk.used / mb, 2),
+            disk_free_mb=round(disk.free / mb, 2),
             timestamp=DateTimeHelper.now_iso()
         )
     
     # === Métodos privados ===
     
-    def _get_files_by_age(self, files: List[Path], max_age_hours: float) -> List[Path]:
-        """Filtra archivos por edad."""
-        eligible = []
-        for file_path in files:
-            age_hours = self._get_file_age_hours(file_path)
-            if age_hours > max_age_hours:
-                eligible.append(file_path)
-        return eligible
-    
-    def _get_file_age_hours(self, file_path: Path) -> float:
-        """Obtiene la edad de un archivo en horas."""
-        mtime = file_path.stat().st_mtime
-        now = time.time()
-        age_seconds = now - mtime
-        return age_seconds / 3600
+    def _filesystem_phases(
+        self,
+        strategy: str,
+        dry_run: bool
+    ) -> Dict[str, Callable[[], CleanupStats]]:
+        """Fases de limpieza sobre subárboles disjuntos, en su orden habitual."""
+        return {
+            "downloads": lambda: self.cleanup_downloads(strategy, dry_run),
+            "logs": lambda: self.cleanup_logs(cleanup_settings.RETENTION_HOURS, dry_run),
+            "metadata": lambda: self.cleanup_metadata(cleanup_settings.RETENTION_HOURS, dry_run),
+            "temp": lambda: self.cleanup_temp(dry_run),
+        }
+    
+    def _log_cleanup_started(self, dry_run: bool) -> None:
+        """Registra el encabezado de una limpieza completa."""
+        self.logger.info("=" * 60)
+        self.logger.info("CLEANUP STARTED")
+        self.logger.info("=" * 60)
+        self.logger.info(f"Config: retention={cleanup_settings.RETENTION_HOURS}h, dry_run={dry_run}")
+        self.logger.info("")
     
-    def _get_dir_age_hours(self, dir_path: Path) -> float:
-        """Obtiene la edad de un directorio en horas (basado en mtime)."""
-        mtime = dir_path.stat().st_mtime
+    def _build_summary(
+        self,
+        start_time: float,
+        order: List[str],
+        results: Dict[str, CleanupStats],
+        errors: List[str],
+        dry_run: bool
+    ) -> CleanupSummary:
+        """
+        Consolida los resultados de cada fase en un CleanupSummary.
+        
+        Args:
+            start_time: Inicio de la limpieza
+            order: Orden de los targets en el resumen
+            results: Estadísticas por target
+            errors: Errores acumulados
+            dry_run: Si la limpieza fue simulada
+            
+        Returns:
+            CleanupSummary con resultados
+        """
+        targets_cleaned = [results[name] for name in order if name in results]
+        total_files = sum(stats.files_deleted for stats in targets_cleaned)
+        total_space = sum(stats.space_freed_mb for stats in targets_cleaned)
+        
+        duration = time.time() - start_time
+        
+        self.logger.info("")
+        self.logger.info("=" * 60)
+        self.logger.info("CLEANUP COMPLETED")
+        self.logger.info("=" * 60)
+        self.logger.info(f"Total files deleted: {total_files}")
+        self.logger.info(f"Total space freed: {total_space:.2f} MB")
+        self.logger.info(f"Duration: {duration:.2f} seconds")
+        if errors:
+            self.logger.warning(f"Errors encountered: {len(errors)}")
+        
+        return CleanupSummary(
+            total_files_deleted=total_files,
+            total_space_freed_mb=round(total_space, 2),
+            targets_cleaned=targets_cleaned,
+            errors=errors,
+            timestamp=DateTimeHelper.now_iso(),
+            duration_seconds=round(duration, 2),
+            dry_run=dry_run
+        )
+    
+    def _list_meta_files(self) -> List[os.DirEntry]:
+        """
+        Lista los archivos meta-*.json con un único os.scandir.
+        
+        Returns:
+            Entradas de directorio de los archivos de metadata
+        """
+        try:
+            with os.scandir(settings.META_DIR) as it:
+                return [
+                    entry for entry in it
+                    if entry.name.startswith("meta-") and entry.name.endswith(".json")
+                    and entry.is_file()
+                ]
+        except FileNotFoundError:
+            return []
+    
+    def _summarize_tree(self, root: Path, fresh: bool = False) -> Tuple[int, int, int]:
+        """
+        Resume un árbol de directorios, reutilizando resultados recientes.
+        
+        Los resúmenes se agrupan en ventanas de _TREE_SUMMARY_TTL_SECONDS para
+        que la caché expire sola.
+        
+        Args:
+            root: Directorio raíz
+            fresh: Si es True, recorre el árbol aunque haya un resumen reciente
+                y lo deja en caché para las siguientes consultas
+            
+        Returns:
+            Tupla (bytes totales, cantidad de archivos, cantidad de directorios)
+        """
+        key = os.fspath(root)
+        bucket = int(time.time() // _TREE_SUMMARY_TTL_SECONDS)
+        if not fresh:
+            cached = _TREE_SUMMARIES.get(key)
+            if cached is not None and cached[0] == bucket:
+                return cached[1]
+        summary = _walk_tree(key)
+        _TREE_SUMMARIES[key] = (bucket, summary)
+        return summary
+    
+    def _scan_files(self, root: Path) -> Iterator[Tuple[str, int, float]]:
+        """
+        Recorre un directorio recursivamente con os.scandir.
+        
+        Usa el tipo de entrada del readdir para distinguir archivos y
+        directorios, y hace un único stat por archivo.
+        
+        Args:
+            root: Directorio raíz
+            
+        Yields:
+            Tuplas (ruta, tamaño en bytes, mtime)
+        """
+        stack = [os.fspath(root)]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file():
+                                st = entry.stat()
+                                yield entry.path, st.st_size, st.st_mtime
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+    
+    def _get_files_by_age(
+        self,
+        files: List[Tuple[str, int, float]],
+        max_age_hours: float
+    ) -> List[Tuple[str, int, float]]:
+        """
+        Filtra archivos por edad.
+        
+        Args:
+            files: Tuplas (ruta, tamaño, mtime) de _scan_files
+            max_age_hours: Edad máxima en horas
+            
+        Returns:
+            Tuplas (ruta, tamaño, edad en horas) de los archivos elegibles
+        """
+        # Filtrar comparando mtimes crudos; la edad solo se calcula para los elegibles
         now = time.time()
-        age_seconds = now - mtime
-        return age_seconds / 3600
+        threshold_mtime = now - max_age_hours * 3600
+        return [
+            (file_path, size_bytes, (now - mtime) / 3600)
+            for file_path, size_bytes, mtime in files
+            if mtime < threshold_mtime
+        ]
     
-    def _get_age_from_timestamp(self, timestamp_str: str) -> float:
+    def _get_age_from_timestamp(self, timestamp_str: str, now: Optional[float] = None) -> float:
         """Calcula edad en horas desde un timestamp ISO."""
+        created_epoch = _parse_iso_epoch(timestamp_str)
+        if created_epoch is not None:
+            if now is None:
+                now = time.time()
+            return (now - created_epoch) / 3600
+        
+        # Formatos no habituales: parseo completo con datetime
         try:
             created = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
             now = datetime.now(created.tzinfo) if created.tzinfo else datetime.now()
@@ -663,44 +1081,48 @@ class CleanupService:
     
     def _get_dir_size(self, dir_path: Path) -> int:
         """Calcula el tamaño total de un directorio en bytes."""
-        total_size = 0
-        try:
-            for item in dir_path.rglob("*"):
-                if item.is_file():
-                    total_size += item.stat().st_size
-        except:
-            pass
-        return total_size
+        return sum(size for _, size, _ in self._scan_files(dir_path))
     
     def _cleanup_orphan_records(self, dry_run: bool) -> int:
         """Limpia registros sin archivos físicos."""
         orphan_count = 0
+        orphans = []
         
         try:
             # Obtener registros con status='ready'
             entries = self.download_index.get_all_ready_entries()
             
+            # Un solo recorrido de downloads confirma en memoria la mayoría de archivos
+            present = frozenset(
+                os.path.normpath(path) for path, _, _ in self._scan_files(settings.DOWNLOAD_DIR)
+            )
+            
             for entry in entries:
-                # Verificar si los archivos existen
-                missing_files = []
-                for file_path_str in entry.files:
-                    file_path = Path(file_path_str)
-                    if not file_path.exists():
-                        missing_files.append(file_path_str)
+                # Lo que el recorrido no vio (enlaces a directorios, directorios
+                # ilegibles, rutas fuera de downloads) se comprueba con
+                # os.path.exists, que sigue enlaces como Path.exists
+                missing_files = [
+                    file_path_str
+                    for file_path_str in entry.files
+                    if os.path.normpath(file_path_str) not in present
+                    and not os.path.exists(file_path_str)
+                ]
                 
                 if missing_files:
                     self.logger.info(f"Orphan record: {entry.url} (missing: {len(missing_files)} files)")
                     
-                    if not dry_run:
-                        # Marcar como fallido en lugar de eliminar
-                        self.download_index._mark_as_failed(
-                            entry.url,
-                            entry.type,
-                            entry.quality,
-                            entry.format,
-                            f"missing_files: {missing_files}"
-                        )
+                    orphans.append((
+                        entry.url,
+                        entry.type,
+                        entry.quality,
+                        entry.format,
+                        f"missing_files: {missing_files}"
+                    ))
                     orphan_count += 1
+            
+            if not dry_run:
+                # Marcar como fallidos en lugar de eliminar (una sola transacción)
+                self.download_index.mark_as_failed_bulk(orphans)
         except Exception as e:
             self.logger.error(f"Error in orphan cleanup: {str(e)}")
         
@@ -709,21 +1131,19 @@ class CleanupService:
     def _cleanup_old_failed_records(self, max_age_hours: float, dry_run: bool) -> int:
         """Elimina registros con status='failed' antiguos."""
         deleted_count = 0
+        keys = []
         
         try:
             old_failed = self.download_index.get_old_failed_entries(max_age_hours)
             
             for entry in old_failed:
                 self.logger.info(f"Old failed record: {entry.url} (error: {entry.error})")
-                
-                if not dry_run:
-                    self.download_index.delete_entry(
-                        entry.url,
-                        entry.type,
-                        entry.quality,
-                        entry.format
-                    )
+                keys.append((entry.url, entry.type, entry.quality, entry.format))
                 deleted_count += 1
+            
+            if not dry_run:
+                # Eliminar todos los registros en una sola transacción
+                self.download_index.delete_entries_bulk(keys)
         except Exception as e:
             self.logger.error(f"Error cleaning old failed records: {str(e)}")
         
@@ -2,7 +2,8 @@
 Orchestrator que coordina el flujo completo de descarga.
 Maneja la lógica de: cache → catálogo → descarga nueva.
 """
-from typing import Optional, Dict, Any
+from secrets import token_hex
+from typing import Optional, Dict, Any, List, Tuple, Callable
 from pathlib import Path
 
 from ..core.config import settings
@@ -26,7 +27,7 @@ class AvailabilityResult:
         error: Optional[str] = None,
         source: Optional[str] = None
     ):
-        self.status = status  # 'ready', 'pending', 'miss'
+        self.status = status  # 'ready', 'pending', 'miss', 'started'
         self.job_id = job_id
         self.files = files or []
         self.error = error
@@ -47,6 +48,12 @@ class DownloadOrchestrator:
     def __init__(self):
         self.download_index = download_index_repo
         self.media_catalog = media_repo
+        # (fuente, tipo de media) -> lanzador del servicio correspondiente
+        self._dispatch: Dict[Tuple[DownloadSource, str], Callable[..., str]] = {
+            (DownloadSource.SPOTIFY, "audio"): self._start_spotify,
+            (DownloadSource.YOUTUBE, "audio"): self._start_youtube_audio,
+            (DownloadSource.YOUTUBE, "video"): self._start_youtube_video,
+        }
     
     def check_availability(
         self,
@@ -61,61 +68,139 @@ class DownloadOrchestrator:
         Returns:
             AvailabilityResult con estado 'ready', 'pending', o 'miss'
         """
-        # 1. Buscar en cache (download index)
-        cached = self.download_index.lookup(url, media_type, quality, format_)
-        
-        if cached and cached.status == "ready":
-            # Actualizar último acceso
-            self.download_index.touch(
+        # 1. Buscar en cache (download index). Un único SELECT resuelve los
+        # casos pendiente y ausente; solo las entradas listas se leen completas
+        # y se tocan (escritura)
+        status = self.download_index.lookup_status(url, media_type, quality, format_)
+        if status and status[0] == "ready":
+            cached = self.download_index.lookup_and_touch(
                 url,
                 media_type,
                 quality,
                 format_,
-                DateTimeHelper.now_iso()
+                DateTimeHelper.now_iso_cached()
             )
+            # None si sus archivos ya no existen: se sigue con el catálogo
+            if cached:
+                return AvailabilityResult(
+                    status="ready",
+                    job_id=cached.job_id,
+                    files=cached.files,
+                    source="cache"
+                )
+        elif status and status[0] == "pending" and status[1]:
             return AvailabilityResult(
-                status="ready",
-                job_id=cached.job_id,
-                files=cached.files,
+                status="pending",
+                job_id=status[1],
                 source="cache"
             )
         
-        if cached and cached.status == "pending" and cached.job_id:
+        # 2. Buscar en catálogo de media
+        found = self._lookup_catalog(url, quality, format_)
+        if found:
+            media_quality, media_format, files = found
+            # Registrar en cache para futuros accesos
+            self.download_index.upsert_ready(
+                url,
+                media_type,
+                media_quality,
+                media_format,
+                files,
+                DateTimeHelper.now_iso_cached()
+            )
             return AvailabilityResult(
-                status="pending",
-                job_id=cached.job_id,
-                source="cache"
+                status="ready",
+                job_id=None,
+                files=files,
+                source="catalog"
             )
         
-        # 2. Buscar en catálogo de media
+        # 3. No encontrado
+        return AvailabilityResult(status="miss")
+    
+    def _lookup_catalog(
+        self,
+        url: str,
+        quality: Optional[str],
+        format_: Optional[str]
+    ) -> Optional[Tuple[Optional[str], Optional[str], List[str]]]:
+        """
+        Busca la URL en el catálogo de media.
+        
+        Returns:
+            (calidad, formato, archivos) si hay un archivo compatible, None si no
+        """
         media = self.media_catalog.get_by_url(url)
+        if not media:
+            return None
         
-        if media:
-            # Verificar si calidad/formato coincide (si se especificó)
-            quality_match = quality is None or media.quality == quality
-            format_match = format_ is None or media.format == format_
-            
-            if quality_match and format_match:
-                file_path = Path(media.path)
-                if file_path.exists():
-                    # Registrar en cache para futuros accesos
-                    self.download_index.upsert_ready(
-                        url,
-                        media_type,
-                        media.quality,
-                        media.format,
-                        [str(file_path)],
-                        DateTimeHelper.now_iso()
-                    )
-                    return AvailabilityResult(
-                        status="ready",
-                        job_id=None,
-                        files=[str(file_path)],
-                        source="catalog"
-                    )
+        # Verificar si calidad/formato coincide (si se especificó)
+        quality_match = quality is None or media.quality == quality
+        format_match = format_ is None or media.format == format_
+        if not (quality_match and format_match):
+            return None
         
-        # 3. No encontrado
-        return AvailabilityResult(status="miss")
+        file_path = Path(media.path)
+        if not file_path.exists():
+            return None
+        return media.quality, media.format, [str(file_path)]
+    
+    def ensure_download(
+        self,
+        url: str,
+        media_type: str,
+        quality: Optional[str] = None,
+        format_: Optional[str] = None,
+        source: Optional[DownloadSource] = None
+    ) -> AvailabilityResult:
+        """
+        Reutiliza una descarga existente o inicia una nueva.
+        
+        Equivale a check_availability + initiate_download, pero la consulta y
+        el registro del pendiente ocurren en una única transacción del índice,
+        así que dos peticiones simultáneas no lanzan dos descargas.
+        
+        Args:
+            source: Fuente ya validada por el llamador; si es None se detecta
+        
+        Returns:
+            AvailabilityResult con estado 'ready', 'pending' o 'started'
+        """
+        if source is None:
+            source = self._determine_source(url)
+        start = self._resolve_starter(source, media_type, url)
+        
+        state, entry = self.download_index.ensure_or_start(
+            url,
+            media_type,
+            quality,
+            format_,
+            job_id_factory=lambda: token_hex(4),
+            now=DateTimeHelper.now_iso_cached(),
+            catalog_lookup=lambda: self._lookup_catalog(url, quality, format_)
+        )
+        
+        if state == "ready" or state == "catalog":
+            return AvailabilityResult(
+                status="ready",
+                job_id=entry.job_id,
+                files=entry.files,
+                source="cache" if state == "ready" else "catalog"
+            )
+        
+        if state == "pending":
+            return AvailabilityResult(
+                status="pending",
+                job_id=entry.job_id,
+                source="cache"
+            )
+        
+        # Solo quien registró el pendiente lanza la descarga
+        return AvailabilityResult(
+            status="started",
+            job_id=entry.job_id,
+            source=start(url, entry.job_id, quality, format_)
+        )
     
     def initiate_download(
         self,
@@ -123,26 +208,42 @@ class DownloadOrchestrator:
         media_type: str,
         quality: Optional[str] = None,
         format_: Optional[str] = None,
-        job_id: Optional[str] = None
+        job_id: Optional[str] = None,
+        source: Optional[DownloadSource] = None
     ) -> Dict[str, Any]:
         """
         Inicia una nueva descarga.
         
+        Args:
+            source: Fuente ya validada por el llamador; si es None se detecta
+        
         Returns:
             Dict con job_id y detalles de la descarga
         """
         # Validar URL y determinar servicio
-        source = self._determine_source(url)
+        if source is None:
+            source = self._determine_source(url)
+        start = self._resolve_starter(source, media_type, url)
         
-        if source == DownloadSource.SPOTIFY:
-            return self._initiate_spotify_download(url, quality, job_id)
-        elif source == DownloadSource.YOUTUBE:
-            if media_type == "audio":
-                return self._initiate_youtube_audio(url, quality, job_id)
-            else:  # video
-                return self._initiate_youtube_video(url, format_, job_id)
-        else:
-            raise ValueError(f"URL no soportada: {url}")
+        if not job_id:
+            job_id = token_hex(4)
+        
+        # Registrar como pendiente
+        self.download_index.register_pending(
+            url,
+            media_type,
+            quality,
+            format_,
+            job_id,
+            DateTimeHelper.now_iso_cached()
+        )
+        
+        # Iniciar descarga asíncrona
+        return {
+            "job_id": job_id,
+            "status": "pending",
+            "source": start(url, job_id, quality, format_)
+        }
     
     def _determine_source(self, url: str) -> DownloadSource:
         """Determina la fuente de la URL."""
@@ -153,113 +254,73 @@ class DownloadOrchestrator:
         else:
             raise ValueError("URL no válida")
     
-    def _initiate_spotify_download(
+    def _resolve_starter(
+        self,
+        source: DownloadSource,
+        media_type: str,
+        url: str
+    ) -> Callable[..., str]:
+        """
+        Obtiene el lanzador del servicio para la fuente y el tipo de media.
+        
+        Se resuelve antes de registrar el pendiente, de modo que una
+        combinación no soportada no deja entradas huérfanas en el índice.
+        
+        Returns:
+            Función (url, job_id, quality, format_) -> nombre del servicio
+        """
+        start = self._dispatch.get((source, media_type))
+        if start is None:
+            raise ValueError(f"URL no soportada: {url}")
+        return start
+    
+    def _start_spotify(
         self,
         url: str,
+        job_id: str,
         quality: Optional[str],
-        job_id: Optional[str]
-    ) -> Dict[str, Any]:
+        format_: Optional[str]
+    ) -> str:
         """Inicia descarga de Spotify."""
-        import uuid
-        
-        if not job_id:
-            job_id = uuid.uuid4().hex[:8]
-        
-        # Registrar como pendiente
-        self.download_index.register_pending(
-            url,
-            "audio",
-            quality,
-            None,
-            job_id,
-            DateTimeHelper.now_iso()
-        )
-        
-        # Iniciar descarga asíncrona
         spotify_download_service.download(
             url=url,
             job_id=job_id,
             callback=None,
             quality=quality
         )
-        
-        return {
-            "job_id": job_id,
-            "status": "pending",
-            "source": "spotify"
-        }
+        return "spotify"
     
-    def _initiate_youtube_audio(
+    def _start_youtube_audio(
         self,
         url: str,
+        job_id: str,
         quality: Optional[str],
-        job_id: Optional[str]
-    ) -> Dict[str, Any]:
+        format_: Optional[str]
+    ) -> str:
         """Inicia descarga de audio de YouTube."""
-        import uuid
-        
-        if not job_id:
-            job_id = uuid.uuid4().hex[:8]
-        
-        # Registrar como pendiente
-        self.download_index.register_pending(
-            url,
-            "audio",
-            quality,
-            None,
-            job_id,
-            DateTimeHelper.now_iso()
-        )
-        
-        # Iniciar descarga asíncrona
         youtube_audio_service.download(
             url=url,
             job_id=job_id,
             callback=None,
             quality=quality
         )
-        
-        return {
-            "job_id": job_id,
-            "status": "pending",
-            "source": "youtube_audio"
-        }
+        return "youtube_audio"
     
-    def _initiate_youtube_video(
+    def _start_youtube_video(
         self,
         url: str,
-        format_: Optional[str],
-        job_id: Optional[str]
-    ) -> Dict[str, Any]:
+        job_id: str,
+        quality: Optional[str],
+        format_: Optional[str]
+    ) -> str:
         """Inicia descarga de video de YouTube."""
-        import uuid
-        
-        if not job_id:
-            job_id = uuid.uuid4().hex[:8]
-        
-        # Registrar como pendiente
-        self.download_index.register_pending(
-            url,
-            "video",
-            None,
-            format_,
-            job_id,
-            DateTimeHelper.now_iso()
-        )
-        
-        # Iniciar descarga asíncrona
         youtube_video_service.download(
             url=url,
             job_id=job_id,
             callback=None,
             format=format_
         )
-        
-        return {
-            "job_id": job_id,
-            "status": "pending",
-            "source": "youtube_video"
-        }
+        return "youtube_video"
 
 
 # Instancia singleton
@@ -7,6 +7,7 @@ which is licensed under the MIT License.
 Copyright (c) 2024 spotDL
 See THIRD_PARTY_LICENSES.md for full license text.
 """
+import os
 from pathlib import Path
 from typing import List
 
@@ -62,13 +63,11 @@ class SpotifyDownloadService(BaseDownloadService):
         Returns:
             Lista con el comando y argumentos
         """
-        cmd = ["spotdl", url, "--output", str(output_path)]
-        
         quality = kwargs.get("quality")
         if quality:
-            cmd.extend(["--bitrate", str(quality)])
+            return ["spotdl", url, "--output", os.fspath(output_path), "--bitrate", str(quality)]
         
-        return cmd
+        return ["spotdl", url, "--output", os.fspath(output_path)]
 
 
 # Instancia global
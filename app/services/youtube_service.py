@@ -2,6 +2,8 @@
 Servicio de descarga de YouTube.
 Implementa la descarga de audio y video desde YouTube usando yt-dlp.
 """
+import os
+from functools import lru_cache
 from pathlib import Path
 from typing import List
 
@@ -19,6 +21,35 @@ from ..core.exceptions import InvalidURLException
 from ..validators import URLValidator
 
 
+# Partes fijas de los comandos yt-dlp; solo se interpolan las variables
+_YT_AUDIO_HEAD = ("yt-dlp", "-x", "--audio-format", YTDLP_AUDIO_EXTRACT_FORMAT, "--audio-quality")
+_YT_VIDEO_HEAD = ("yt-dlp", "-f")
+# Plantilla de salida de yt-dlp, relativa al directorio del job
+_OUTPUT_TMPL = os.sep + "%(title)s.%(ext)s"
+
+
+@lru_cache(maxsize=16)
+def _get_format_selector(merge_format: str) -> str:
+    """
+    Retorna el selector de formato óptimo según el contenedor solicitado.
+    
+    Args:
+        merge_format: Formato del contenedor (mp4, webm, mkv, etc.)
+        
+    Returns:
+        String con el selector de formato para yt-dlp
+    """
+    # Normalizar formato y obtener selector desde constantes
+    fmt = (merge_format or DEFAULT_VIDEO_FORMAT).lower()
+
+    info = VIDEO_FORMAT_INFO.get(fmt)
+    if info and info.get("selector"):
+        return info["selector"]
+
+    # Fallback al selector por defecto de yt-dlp
+    return YTDLP_BEST_VIDEO_FORMAT
+
+
 class YouTubeAudioService(BaseDownloadService):
     """Servicio para descargar audio de YouTube."""
     
@@ -64,22 +95,10 @@ class YouTubeAudioService(BaseDownloadService):
         Returns:
             Lista con el comando y argumentos
         """
-        output_template = str(output_path / "%(title)s.%(ext)s")
+        output_template = os.fspath(output_path) + _OUTPUT_TMPL
         audio_quality = str(kwargs.get("quality", "0"))
         
-        cmd = [
-            "yt-dlp",
-            "-x",
-            "--audio-format",
-            YTDLP_AUDIO_EXTRACT_FORMAT,
-            "--audio-quality",
-            audio_quality,
-            "-o",
-            output_template,
-            url,
-        ]
-        
-        return cmd
+        return [*_YT_AUDIO_HEAD, audio_quality, "-o", output_template, url]
 
 
 class YouTubeVideoService(BaseDownloadService):
@@ -127,44 +146,18 @@ class YouTubeVideoService(BaseDownloadService):
         Returns:
             Lista con el comando y argumentos
         """
-        output_template = str(output_path / "%(title)s.%(ext)s")
+        output_template = os.fspath(output_path) + _OUTPUT_TMPL
         merge_format = kwargs.get("format") or DEFAULT_VIDEO_FORMAT
 
-        format_selector = self._get_format_selector(merge_format)
+        format_selector = _get_format_selector(merge_format)
         
-        cmd = [
-            "yt-dlp",
-            "-f",
-            format_selector,
-            "--merge-output-format",
-            merge_format,
+        return [
+            *_YT_VIDEO_HEAD, format_selector,
+            "--merge-output-format", merge_format,
             "--restrict-filenames",
-            "-o",
-            output_template,
+            "-o", output_template,
             url,
         ]
-        
-        return cmd
-    
-    def _get_format_selector(self, merge_format: str) -> str:
-        """
-        Retorna el selector de formato óptimo según el contenedor solicitado.
-        
-        Args:
-            merge_format: Formato del contenedor (mp4, webm, mkv, etc.)
-            
-        Returns:
-            String con el selector de formato para yt-dlp
-        """
-        # Normalizar formato y obtener selector desde constantes
-        fmt = (merge_format or DEFAULT_VIDEO_FORMAT).lower()
-
-        info = VIDEO_FORMAT_INFO.get(fmt)
-        if info and info.get("selector"):
-            return info["selector"]
-
-        # Fallback al selector por defecto de yt-dlp
-        return YTDLP_BEST_VIDEO_FORMAT
 
 
 # Instancias globales
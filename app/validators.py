@@ -3,11 +3,11 @@ Validadores de entrada de la aplicación.
 Separa las responsabilidades de validación del resto de utilidades.
 """
 import re
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
 from .core.constants import (
     SPOTIFY_URI_PATTERN,
     SPOTIFY_URL_PATTERN,
-    BITRATE_PATTERN,
     SPOTIFY_URL_PREFIXES,
     YOUTUBE_URL_PREFIXES,
 )
@@ -16,6 +16,59 @@ from .core.exceptions import InvalidURLException, InvalidQualityException, Inval
 from .core.constants import ALLOWED_VIDEO_FORMATS
 
 
+_SPOTIFY_URI_RE = re.compile(SPOTIFY_URI_PATTERN)
+_SPOTIFY_URL_RE = re.compile(SPOTIFY_URL_PATTERN)
+_NUM_SUFFIX_RE = re.compile(r"(\d+)([kK]?)")
+
+
+@lru_cache(maxsize=1024)
+def _normalize_quality(value: str) -> Tuple[Optional[str], str]:
+    """
+    Calcula la calidad para spotdl y yt-dlp (ver QualityValidator.normalize_quality).
+    
+    Returns:
+        Tupla (spotdl, ytdlp)
+    """
+    v = value.strip()
+    if v == "":
+        return None, "0"
+    
+    lv = v.lower()
+    
+    if lv == "0":
+        return None, "0"
+    if lv == "bestaudio":
+        return None, "bestaudio"
+    
+    # Número con o sin sufijo
+    m = _NUM_SUFFIX_RE.fullmatch(v)
+    if m:
+        num = m.group(1)
+        # spotdl usa lowercase 'k', yt-dlp usa uppercase 'K'
+        return f"{num}k", f"{num}K"
+    
+    return None, lv
+
+
+@lru_cache(maxsize=1024)
+def _is_valid_bitrate(value: str) -> bool:
+    """Valida un bitrate ya comprobado como str (ver QualityValidator.is_valid_bitrate)."""
+    v = value.strip().lower()
+    if v == "0" or v == "bestaudio":
+        return True
+    
+    # Equivale a \d+[kK]?; isdecimal acepta los mismos dígitos que \d
+    digits = v[:-1] if v.endswith("k") else v
+    return digits.isdecimal()
+
+
+@lru_cache(maxsize=1024)
+def _is_valid_video_format(fmt: str) -> bool:
+    """Valida un formato ya comprobado como str (ver FormatValidator.is_valid_video_format)."""
+    # Casi siempre llega ya en minúsculas: evita la copia de lower()
+    return fmt in ALLOWED_VIDEO_FORMATS or fmt.lower() in ALLOWED_VIDEO_FORMATS
+
+
 class URLValidator:
     """Validador de URLs para diferentes servicios."""
     
@@ -35,15 +88,16 @@ class URLValidator:
         
         s = url.strip()
         
+        # Descarte barato antes de los regex (p. ej. URLs de YouTube)
+        if not s.startswith(SPOTIFY_URL_PREFIXES):
+            return False
+        
         # spotify:track:<id> or spotify:album:<id> or spotify:playlist:<id>
-        if re.match(SPOTIFY_URI_PATTERN, s):
-            return True
+        if s.startswith("spotify:"):
+            return _SPOTIFY_URI_RE.fullmatch(s) is not None
         
         # URLs like https://open.spotify.com/intl-es/track/<id>?si=...
-        if re.match(SPOTIFY_URL_PATTERN, s):
-            return True
-        
-        return False
+        return _SPOTIFY_URL_RE.match(s) is not None
     
     @staticmethod
     def is_youtube_url(url: str) -> bool:
@@ -115,11 +169,10 @@ class QualityValidator:
         Returns:
             True si es válido
         """
+        # El tipo se comprueba antes de la caché: lru_cache exige valores hashables
         if value is None or not isinstance(value, str):
             return False
-        
-        v = value.strip().lower()
-        return bool(re.match(BITRATE_PATTERN, v))
+        return _is_valid_bitrate(value)
     
     @staticmethod
     def normalize_quality(value: Optional[str]) -> dict:
@@ -132,26 +185,12 @@ class QualityValidator:
         Returns:
             dict con claves 'spotdl' y 'ytdlp'
         """
-        if value is None or not isinstance(value, str) or value.strip() == "":
+        if value is None or not isinstance(value, str):
             return {"spotdl": None, "ytdlp": "0"}
         
-        v = value.strip()
-        lv = v.lower()
-        
-        if lv == "0":
-            return {"spotdl": None, "ytdlp": "0"}
-        if lv == "bestaudio":
-            return {"spotdl": None, "ytdlp": "bestaudio"}
-        
-        # Número con o sin sufijo
-        m = re.match(r"^(\d+)([kK]?)$", v)
-        if m:
-            num = m.group(1)
-            spot = f"{num}k"  # spotdl usa lowercase 'k'
-            ytd = f"{num}K"   # yt-dlp usa uppercase 'K'
-            return {"spotdl": spot, "ytdlp": ytd}
-        
-        return {"spotdl": None, "ytdlp": lv}
+        # Se cachea una tupla inmutable; cada llamador recibe su propio dict
+        spot, ytd = _normalize_quality(value)
+        return {"spotdl": spot, "ytdlp": ytd}
     
     @staticmethod
     def validate_quality(quality: Optional[str]) -> Optional[str]:
@@ -190,9 +229,10 @@ class FormatValidator:
         Returns:
             True si es válido
         """
+        # El tipo se comprueba antes de la caché: lru_cache exige valores hashables
         if not fmt or not isinstance(fmt, str):
             return False
-        return fmt.lower() in ALLOWED_VIDEO_FORMATS
+        return _is_valid_video_format(fmt)
     
     @staticmethod
     def validate_format(fmt: Optional[str]) -> Optional[str]:
@@ -212,6 +252,6 @@ class FormatValidator:
             return None
         
         if not FormatValidator.is_valid_video_format(fmt):
-            raise InvalidFormatException(format_value=fmt, valid_formats=list(ALLOWED_VIDEO_FORMATS))
+            raise InvalidFormatException(format_value=fmt, valid_formats=sorted(ALLOWED_VIDEO_FORMATS))
         
         return fmt.lower()
@@ -7,12 +7,13 @@ if __name__ == "__main__":
     # Cargar variables de entorno desde .env
     load_dotenv()
     
-    # Usar configuración centralizada
+    # Usar configuración centralizada (leída una sola vez)
+    host, port, reload_, workers = settings.HOST, settings.PORT, settings.RELOAD, settings.WORKERS
     uvicorn.run(
         "app.api:app",
-        host=settings.HOST,
-        port=settings.PORT,
-        reload=settings.RELOAD,
-        workers=settings.WORKERS if not settings.RELOAD else 1
+        host=host,
+        port=port,
+        reload=reload_,
+        workers=workers if not reload_ else 1
     )
 